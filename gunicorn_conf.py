@@ -0,0 +1,31 @@
+"""Gunicorn settings for the FastAPI backend: `gunicorn src.main:app -c gunicorn_conf.py`."""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# One event loop per process; several processes spread CPU-bound work
+# (validation, JSON encoding, bcrypt) across cores.
+# The default is capped: in a container os.cpu_count() reports the host's CPUs,
+# and every worker opens its own asyncpg pool (PG_POOL_MAX_SIZE connections)
+# against Supabase's connection limit.
+MAX_DEFAULT_WORKERS = 4
+
+
+def _default_workers() -> int:
+    # Without REDIS_URL each worker would keep its own response cache, and a
+    # write would only invalidate the worker that served it, so run just one
+    if not os.getenv("REDIS_URL"):
+        return 1
+    return min((os.cpu_count() or 1) * 2 + 1, MAX_DEFAULT_WORKERS)
+
+
+workers = int(os.getenv("WEB_CONCURRENCY", _default_workers()))
+# Uses uvloop + httptools (installed by uvicorn[standard]) automatically
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Keep idle client connections open longer than typical proxy/LB idle timeouts
+keepalive = 65
+# Queue bursts of incoming connections instead of refusing them
+backlog = 2048
+timeout = 120
@@ -1,21 +1,130 @@
 # src/app.py
 import os
+import html
+import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import date, timedelta
-from dotenv import load_dotenv
 from typing import List, Dict, Any
 from utils.tool_registry import consume_debug_log
-from config import ConfigManager
-from core import DocumentIndexManager, CasaAmigoAgent
+from config import ConfigManager, ensure_dotenv
+from core import DocumentIndexManager, CasaAmigoAgent, AgentConfig
 from utils.current_auth import set_current_auth
 from utils.moderation import moderate_content, get_moderation_message
 import requests
 from audiorecorder import audiorecorder
 from utils.voice import VoiceManager
 
+
+@st.cache_resource
+def _get_http_session() -> requests.Session:
+    """Shared keep-alive session for backend calls, reused across reruns."""
+    return requests.Session()
+
+
+@st.cache_resource
+def _get_io_pool() -> ThreadPoolExecutor:
+    """Threads for independent backend GETs that are issued concurrently."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="backend-io")
+
+
+@st.cache_resource
+def _get_persist_executor() -> ThreadPoolExecutor:
+    """
+    Single background thread for chat persistence writes: turns are posted
+    one at a time, in the order they were submitted, so they are stored in
+    conversation order.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-persist")
+
+
+_worker_local = threading.local()
+
+
+def _thread_http_session() -> requests.Session:
+    """Keep-alive session owned by the calling pool thread (requests.Session isn't thread-safe)."""
+    session = getattr(_worker_local, "session", None)
+    if session is None:
+        session = _worker_local.session = requests.Session()
+    return session
+
+
+def _request_json(url: str, params: dict, headers: dict):
+    # Safe to run off the script thread: no st.* calls, errors propagate to the caller
+    r = _thread_http_session().get(url, params=params, headers=headers, timeout=20)
+    r.raise_for_status()
+    return r.json()
+
+
+def _post_in_background(url: str, payload, headers: dict):
+    # Runs off the script thread: no st.* calls here, failures are only logged
+    try:
+        r = _thread_http_session().post(url, json=payload, headers=headers, timeout=20)
+        r.raise_for_status()
+    except Exception as e:
+        print(f"[APP] Backend POST failed: {url} — {e}")
+
+
+# ===== CACHED RESOURCES (built once per process, reused across reruns) =====
+@st.cache_resource
+def configure_logging(verbose: bool) -> None:
+    """
+    Process-wide logging for the app's own modules, set up once (not per agent
+    construction). In debug mode core.* debug records get a stderr handler;
+    without one Python's last-resort handler drops everything below WARNING.
+    """
+    core_logger = logging.getLogger("core")
+    core_logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    if verbose and not core_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[%(name)s] %(levelname)s: %(message)s"))
+        core_logger.addHandler(handler)
+
+
+@st.cache_resource
+def get_config() -> ConfigManager:
+    return ConfigManager()
+
+
+@st.cache_resource
+def get_doc_manager(api_key: str) -> DocumentIndexManager:
+    return DocumentIndexManager(api_key=api_key)
+
+
+@st.cache_resource
+def get_chatbot(_index, api_key: str, verbose: bool = False, index_version: str = "") -> CasaAmigoAgent:
+    # Leading underscore: Streamlit skips hashing the VectorStoreIndex;
+    # index_version is hashed instead, so a rebuilt index gets a new agent
+    return CasaAmigoAgent(_index, api_key, AgentConfig(verbose=verbose), index_version=index_version)
+
+
+@st.cache_resource
+def get_voice_manager(api_key: str) -> VoiceManager:
+    return VoiceManager(api_key)
+
+
+@st.cache_data
+def _load_logo_bytes() -> bytes | None:
+    """Sidebar logo, read from disk once instead of stat-ing it on every rerun."""
+    logo_path = os.path.join(os.path.dirname(__file__), "..", "assets", "logo.png")
+    if not os.path.exists(logo_path):
+        return None
+    with open(logo_path, "rb") as f:
+        return f.read()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _get_tenant_bundle(base: str, user_id: str, _headers: dict) -> dict:
+    """Tenant profile + preferences in one backend round-trip, cached briefly per user."""
+    r = _get_http_session().get(f"{base}/tenantprofiles/{user_id}/bundle", headers=_headers, timeout=20)
+    r.raise_for_status()
+    return r.json()
+
+
 class StreamlitApp:
     # ===== BRAND COLORS & ASSETS =====
     RED: str = "#D84339"
@@ -25,35 +134,44 @@ class StreamlitApp:
     thinking_icon = os.path.join(os.path.dirname(__file__), "..", "assets", "load_robot_avatar.gif")
     user_icon = os.path.join(os.path.dirname(__file__), "..", "assets", "user_avatar.png")
 
+    # ===== CHAT HISTORY =====
+    # Only the most recent messages are kept in session state; the full
+    # history is persisted through the backend conversations API.
+    CHAT_HISTORY_WINDOW: int = 50
+    # Messages at the end of the history still drawn as full chat_message
+    # blocks with avatars (2 turns); older ones are batched into one element.
+    CHAT_AVATAR_TAIL: int = 4
+    _USER_BUBBLE: str = '<div class="ca-bubble ca-user">{content}</div>'
+    _ASSIST_BUBBLE: str = '<div class="ca-bubble ca-assist">{content}</div>'
+
     def __init__(self):
-        self.config_manager = ConfigManager()
-        self.doc_manager = DocumentIndexManager(api_key=self.config_manager.api_key)
-        self.chatbot = CasaAmigoAgent(self.doc_manager.index, self.config_manager.api_key)
-        self.voice_manager = VoiceManager(self.config_manager.api_key)
+        self.config_manager = get_config()
+        configure_logging(self.config_manager.get_debug_mode())
+        self.doc_manager = get_doc_manager(self.config_manager.api_key)
+        self.chatbot = get_chatbot(
+            self.doc_manager.index,
+            self.config_manager.api_key,
+            verbose=self.config_manager.get_debug_mode(),
+            index_version=self.doc_manager.index_version,
+        )
+        self.voice_manager = get_voice_manager(self.config_manager.api_key)
         self._setup_page()
         self._inject_styles()
         self._initialize_session_state()
 
     # ===== SETUP & STYLING =====
-    def _setup_page(self):
-        st.set_page_config(page_title="Casa Amigo Chatbot", page_icon="🏠", layout="wide")
-        st.markdown(
-            f"""
+    # Static HTML/CSS, formatted once when the class is defined rather than on every rerun
+    _HEADER_HTML: str = f"""
             <div style="
                 display:flex;justify-content:center;align-items:center;
                 gap:10px;flex-wrap:wrap;margin:0 0 14px 0;
-                font-weight:800;font-size:2rem;line-height:1.2;color:{self.BLUE};
+                font-weight:800;font-size:2rem;line-height:1.2;color:{BLUE};
             ">
               <span style="font-size:2.1rem;"> Your Rental Assistant Chatbot</span>
             </div>
-            """,
-            unsafe_allow_html=True,
-        )
+            """
 
-    def _inject_styles(self):
-        """Styling (gradient sidebar, bubbles, avatars, footer, typography)"""
-        st.markdown(
-            f"""
+    _STYLES_HTML: str = f"""
             <style>
             /* === FIX FOR SIDEBAR COLLAPSE BUTTON === */
             /* Hide the Material icon text "keyboard_double_arrow_left" */
@@ -119,7 +237,7 @@ class StreamlitApp:
 
             /* === SIDEBAR STYLING - CONSISTENT TYPOGRAPHY === */
             [data-testid="stSidebar"] > div:first-child {{
-                background: linear-gradient(180deg, {self.NAVY} 0%, {self.BLUE} 55%, {self.RED} 130%);
+                background: linear-gradient(180deg, {NAVY} 0%, {BLUE} 55%, {RED} 130%);
                 color: #FFFFFF;
                 font-family: ui-sans-serif, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif;
             }}
@@ -249,7 +367,7 @@ class StreamlitApp:
             [data-testid="stChatInput"] textarea {{
                 background: #FFFFFF !important; 
                 color: #000 !important;
-                border: 2px solid {self.RED}80 !important; 
+                border: 2px solid {RED}80 !important; 
                 border-radius: 10px !important;
                 font-size: 0.9rem !important; 
                 padding: 0.6rem 1rem !important;
@@ -261,8 +379,8 @@ class StreamlitApp:
             
             [data-testid="stSidebar"] textarea:focus,
             [data-testid="stChatInput"] textarea:focus {{
-                border: 2px solid {self.RED} !important;
-                box-shadow: 0 0 6px {self.RED}60 !important;
+                border: 2px solid {RED} !important;
+                box-shadow: 0 0 6px {RED}60 !important;
             }}
 
             /* Selectbox styling */
@@ -411,11 +529,11 @@ class StreamlitApp:
             }}
             .ca-user {{ 
                 background: rgba(216, 67, 57, 0.08); 
-                border-left: 4px solid {self.RED}; 
+                border-left: 4px solid {RED}; 
             }}
             .ca-assist {{ 
                 background: rgba(44, 75, 142, 0.08); 
-                border-left: 4px solid {self.BLUE}; 
+                border-left: 4px solid {BLUE}; 
             }}
 
             /* Avatars larger & circular */
@@ -434,14 +552,14 @@ class StreamlitApp:
                 padding: 12px 16px; 
                 margin: 6px 0;
                 background: rgba(44, 75, 142, 0.08); 
-                border-left: 4px solid {self.BLUE};
+                border-left: 4px solid {BLUE};
             }}
             .ca-dot {{
                 display:inline-block; 
                 width:6px; 
                 height:6px; 
                 margin:0 2px;
-                background:{self.BLUE}; 
+                background:{BLUE}; 
                 border-radius:50%; 
                 animation: ca-bounce 1s infinite;
             }}
@@ -505,7 +623,19 @@ class StreamlitApp:
                 gap: 0 !important;
             }}
             </style>
-            """,
+            """
+
+    def _setup_page(self):
+        st.set_page_config(page_title="Casa Amigo Chatbot", page_icon="🏠", layout="wide")
+        st.markdown(
+            self._HEADER_HTML,
+            unsafe_allow_html=True,
+        )
+
+    def _inject_styles(self):
+        """Styling (gradient sidebar, bubbles, avatars, footer, typography)"""
+        st.markdown(
+            self._STYLES_HTML,
             unsafe_allow_html=True,
         )
 
@@ -570,7 +700,7 @@ class StreamlitApp:
             if user_type:
                 params["user_type"] = user_type
 
-            r = requests.post(
+            r = _get_http_session().post(
                 f"{API_BASE}/auth/login",
                 params=params,
                 timeout=15,
@@ -629,30 +759,75 @@ class StreamlitApp:
     def _get_json(self, path: str, params: dict | None = None, fallback=None):
         base = self._api_base()
         try:
-            r = requests.get(f"{base}{path}", params=params or {}, headers=self._auth_headers(), timeout=20)
+            r = _get_http_session().get(f"{base}{path}", params=params or {}, headers=self._auth_headers(), timeout=20)
             r.raise_for_status()
             return r.json()
         except Exception as e:
             st.caption(f"⚠️ Backend GET failed: {path} — {e}")
             return fallback
 
-    def _fetch_properties(self, limit: int = 50, offset: int = 0) -> list[dict]:
-        data = self._get_json("/properties", params={"limit": limit, "offset": offset}, fallback={"properties": []})
-        return data.get("properties", [])
+    def _get_json_many(self, *requests_: tuple) -> list:
+        """
+        Several independent GETs at once, each given as (path, params, fallback).
+        Results come back in the same order; a failed request yields its fallback.
+        """
+        base, headers = self._api_base(), self._auth_headers()
+        futures = [
+            _get_io_pool().submit(_request_json, f"{base}{path}", params or {}, headers)
+            for path, params, _ in requests_
+        ]
+        results = []
+        for (path, _, fallback), future in zip(requests_, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                st.caption(f"⚠️ Backend GET failed: {path} — {e}")
+                results.append(fallback)
+        return results
+
+    def _post_json(self, path: str, payload: dict, fallback=None):
+        base = self._api_base()
+        try:
+            r = _get_http_session().post(f"{base}{path}", json=payload, headers=self._auth_headers(), timeout=20)
+            r.raise_for_status()
+            return r.json()
+        except Exception as e:
+            st.caption(f"⚠️ Backend POST failed: {path} — {e}")
+            return fallback
+
+    def _fetch_agent_dashboard_data(self, limit: int = 200) -> tuple[list[dict], list[dict]]:
+        """Listings and tenancy agreements for the agent dashboard, fetched concurrently."""
+        props, agreements = self._get_json_many(
+            ("/properties", {"limit": limit, "offset": 0}, {"properties": []}),
+            ("/tenancy-agreements", {"limit": limit, "offset": 0}, {"agreements": []}),
+        )
+        props = (props or {}).get("properties", [])
+        if isinstance(agreements, dict):
+            agreements = agreements.get("agreements", [])
+        return props, agreements or []
+
+    def _fetch_tenant_bundle(self, user_id: str) -> dict:
+        """
+        Fetch profile and preferences together using GET /tenantprofiles/{user_id}/bundle.
+        Errors are not cached, so a failed call is retried on the next rerun.
+        """
+        try:
+            return _get_tenant_bundle(self._api_base(), str(user_id), self._auth_headers())
+        except Exception as e:
+            st.caption(f"⚠️ Backend GET failed: /tenantprofiles/{user_id}/bundle — {e}")
+            return {}
 
     def _fetch_tenant_profile(self, user_id: str | None = None) -> dict | None:
         """
-        Fetch the tenant profile for the logged-in user.
-        Uses GET /tenantprofiles/{user_id}
+        Fetch the tenant profile for the logged-in user (from the tenant bundle).
         """
         if not user_id:
             return None
-        data = self._get_json(f"/tenantprofiles/{user_id}", fallback=None)
-        return data
+        return self._fetch_tenant_bundle(user_id).get("profile")
 
     def _fetch_tenant_preferences(self, user_id: str | None = None) -> list[dict]:
         """
-        Fetch tenant's property preferences using GET /preferences/{user_id}.
+        Fetch tenant's property preferences (from the tenant bundle).
         Backend can return:
         - a list
         - a single dict
@@ -661,7 +836,7 @@ class StreamlitApp:
         if not user_id:
             return []
 
-        data = self._get_json(f"/preferences/{user_id}", fallback=None)
+        data = self._fetch_tenant_bundle(user_id).get("preferences")
         if not data:
             return []
 
@@ -680,19 +855,6 @@ class StreamlitApp:
 
         return []
 
-    def _fetch_tenancy_agreements(self, limit: int = 50, offset: int = 0) -> list[dict]:
-        """
-        Fetch tenancy agreements for agents from GET /tenancy-agreements.
-        """
-        data = self._get_json(
-            "/tenancy-agreements",
-            params={"limit": limit, "offset": offset},
-            fallback={"agreements": []},
-        )
-        if isinstance(data, dict):
-            return data.get("agreements", [])
-        return data or []
-    
     def _clean_df_for_display(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Remove embedding or vector-like columns from any DataFrame before showing in UI.
@@ -817,9 +979,9 @@ class StreamlitApp:
         role = st.session_state.get("active_role")
         with st.sidebar:
             # 1) Logo
-            logo_path = os.path.join(os.path.dirname(__file__), "..", "assets", "logo.png")
-            if os.path.exists(logo_path):
-                st.image(logo_path, use_container_width=True)
+            logo_bytes = _load_logo_bytes()
+            if logo_bytes:
+                st.image(logo_bytes, use_container_width=True)
             else:
                 st.warning("⚠️ Logo not found at the specified path.")
 
@@ -929,6 +1091,8 @@ class StreamlitApp:
                     st.session_state["messages"] = [
                         {"role": "assistant", "content": "Hello!👋 Ask me anything about your rental agreements."}
                     ]
+                    st.session_state.pop("conversation_id", None)
+                    st.session_state.pop("chat_memory", None)
                     st.toast("Chat history cleared.")
                 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -936,15 +1100,92 @@ class StreamlitApp:
             st.markdown("<div class='ca-sep'></div>", unsafe_allow_html=True)
             st.markdown("<div class='ca-footer'>⚡ Powered by Casa Amigo © 2025</div>", unsafe_allow_html=True)
 
+    # ===== CHAT PERSISTENCE =====
+    def _ensure_conversation_id(self) -> str | None:
+        """Return the backend conversation for this session, creating it on first use."""
+        if st.session_state.get("conversation_id"):
+            return st.session_state["conversation_id"]
+
+        auth = st.session_state.get("auth", {}) or {}
+        if not auth.get("logged_in") or not auth.get("user_id"):
+            return None
+
+        created = self._post_json("/conversations", {"user_id": auth["user_id"]}, fallback=None)
+        conversation_id = (created or {}).get("conversation_id")
+        st.session_state["conversation_id"] = conversation_id
+        return conversation_id
+
+    def _append_message(self, role: str, content: str) -> dict:
+        """Append a chat message and trim the in-memory window (see _persist_messages)."""
+        message = {"role": role, "content": content}
+        messages = st.session_state["messages"]
+        messages.append(message)
+        del messages[:-self.CHAT_HISTORY_WINDOW]
+        return message
+
+    def _persist_messages(self, *messages: dict):
+        """
+        Persist a chat turn (user + assistant message) with one batch insert.
+        The request is sent on a background thread, not the script thread.
+        """
+        conversation_id = self._ensure_conversation_id()
+        if not conversation_id or not messages:
+            return
+        _get_persist_executor().submit(
+            _post_in_background,
+            f"{self._api_base()}/conversations/{conversation_id}/messages/batch",
+            [{"message": m["content"], "role": m["role"]} for m in messages],
+            self._auth_headers(),
+        )
+
+    def _restore_chat_history(self):
+        """Reload the latest conversation window from the backend after login."""
+        user_id = (st.session_state.get("auth", {}) or {}).get("user_id")
+        if not user_id:
+            return
+
+        # Conversation + its latest messages in one request
+        data = self._get_json(
+            f"/conversations/{user_id}/latest",
+            params={"limit": self.CHAT_HISTORY_WINDOW},
+            fallback={"conversation": None, "messages": []},
+        ) or {}
+        conversation_id = (data.get("conversation") or {}).get("conversation_id")
+        if not conversation_id:
+            return
+        rows = data.get("messages") or []
+
+        st.session_state["conversation_id"] = conversation_id
+        if rows:
+            st.session_state["messages"] = [
+                {"role": row.get("role", "assistant"), "content": row.get("message", "")}
+                for row in rows
+            ]
+
     # ===== CHAT HANDLERS =====
+    def _bubble_html(self, role: str, content: str) -> str:
+        # User text is escaped (rendered with unsafe_allow_html); assistant
+        # replies keep their formatting HTML (<br>, <b>, citation blockquotes).
+        if role == "user":
+            return self._USER_BUBBLE.format(content=html.escape(content, quote=False))
+        return self._ASSIST_BUBBLE.format(content=content)
+
     def _display_chat_history(self):
-        for msg in st.session_state["messages"]:
+        messages = st.session_state["messages"]
+        older, recent = messages[:-self.CHAT_AVATAR_TAIL], messages[-self.CHAT_AVATAR_TAIL:]
+
+        # Older history: one markdown element for all bubbles instead of one per message
+        if older:
+            history_html = "".join(self._bubble_html(m["role"], m["content"]) for m in older)
+            with st.container():
+                st.markdown(history_html, unsafe_allow_html=True)
+
+        for msg in recent:
             role = msg["role"]
             content = msg["content"]
             avatar = self.user_icon if role == "user" else self.idle_icon
-            bubble_class = "ca-user" if role == "user" else "ca-assist"
             with st.chat_message(role, avatar=avatar):
-                st.markdown(f'<div class="ca-bubble {bubble_class}">{content}</div>', unsafe_allow_html=True)
+                st.markdown(self._bubble_html(role, content), unsafe_allow_html=True)
 
     def _process_query(self, user_query: str):
         """Process a user query (from text or voice)"""
@@ -958,9 +1199,9 @@ class StreamlitApp:
             warning_msg = get_moderation_message(flagged_cats)
 
             # Show user message
-            st.session_state["messages"].append({"role": "user", "content": user_query})
+            user_message = self._append_message("user", user_query)
             with st.chat_message("user", avatar=self.user_icon):
-                st.markdown(f'<div class="ca-bubble ca-user">{user_query}</div>', unsafe_allow_html=True)
+                st.markdown(self._bubble_html("user", user_query), unsafe_allow_html=True)
 
             # Show moderation warning
             warning_response = (
@@ -970,9 +1211,9 @@ class StreamlitApp:
             )
 
             with st.chat_message("assistant", avatar=self.idle_icon):
-                st.markdown(f'<div class="ca-bubble ca-assist">{warning_response}</div>', unsafe_allow_html=True)
+                st.markdown(self._bubble_html("assistant", warning_response), unsafe_allow_html=True)
 
-            st.session_state["messages"].append({"role": "assistant", "content": warning_response})
+            self._persist_messages(user_message, self._append_message("assistant", warning_response))
 
             if "moderation_flags" not in st.session_state:
                 st.session_state["moderation_flags"] = []
@@ -987,18 +1228,16 @@ class StreamlitApp:
         # Content is safe - Continue with normal flow
         print(f"[APP] Content passed moderation")
 
-        # user message
-        st.session_state["messages"].append({"role": "user", "content": user_query})
+        # user message (persisted together with the reply below)
+        user_message = self._append_message("user", user_query)
         with st.chat_message("user", avatar=self.user_icon):
-            st.markdown(f'<div class="ca-bubble ca-user">{user_query}</div>', unsafe_allow_html=True)
+            st.markdown(self._bubble_html("user", user_query), unsafe_allow_html=True)
 
         # assistant thinking + reply
         with st.chat_message("assistant", avatar=self.thinking_icon):
             placeholder = st.empty()
-            for _ in range(3):
-                dots_html = "<span class='ca-dot'></span>" * 3
-                placeholder.markdown(f"<div class='ca-typing'>{dots_html}</div>", unsafe_allow_html=True)
-                time.sleep(0.35)
+            dots_html = "<span class='ca-dot'></span>" * 3
+            placeholder.markdown(f"<div class='ca-typing'>{dots_html}</div>", unsafe_allow_html=True)
 
             try:
                 auth = st.session_state.get("auth", {})
@@ -1021,13 +1260,14 @@ class StreamlitApp:
                 response = "⚠️ Sorry, something went wrong. Please try again."
                 st.toast(f"Backend error: {e}")
 
-            placeholder.markdown(f"<div class='ca-bubble ca-assist'>{response}</div>", unsafe_allow_html=True)
+            placeholder.markdown(self._bubble_html("assistant", response), unsafe_allow_html=True)
             
             # Voice responses are removed - keeping interface clean and simple
 
-            # debug expander
+            # debug expander (inline: the chat view runs as a fragment,
+            # which cannot write to the sidebar)
             if self.config_manager.get_debug_mode():
-                with st.sidebar.expander("🔎 Debug (last turn)", expanded=False):
+                with st.expander("🔎 Debug (last turn)", expanded=False):
                     st.write("**Input Moderation:**")
                     if moderation_result.get("error"):
                         st.warning(f"Moderation error: {moderation_result['error']}")
@@ -1043,7 +1283,7 @@ class StreamlitApp:
                         for row in logs:
                             if row["event"] == "tool_called":
                                 st.write(f"**Tool:** `{row['tool']}`")
-                                st.code(row["args"])
+                                st.code(row["args_pretty"])
                             elif row["event"] == "retrieval":
                                 st.write(f"**retrieved_k:** {row['retrieved_k']}")
                                 top = row.get("top", [])
@@ -1060,26 +1300,27 @@ class StreamlitApp:
                         st.write("**Agent tool calls**")
                         for c in calls:
                             st.write(f"- #{c['i']} **{c['name']}**")
-                            st.code(c["args"])
+                            st.code(c["args_pretty"])
                     else:
                         st.caption("No agent tool calls recorded.")
 
-        # persist assistant message
-        st.session_state["messages"].append({"role": "assistant", "content": response})
+        # persist the whole turn in one request
+        self._persist_messages(user_message, self._append_message("assistant", response))
 
     def _handle_user_input(self):
         # Check for pending voice query from sidebar
-        if st.session_state.get("pending_voice_query"):
-            query = st.session_state["pending_voice_query"]
+        voice_query = st.session_state.get("pending_voice_query")
+        if voice_query:
             st.session_state["pending_voice_query"] = None  # Clear it
-            self._process_query(query)
-            st.rerun()
-            return
-        
+
         # Handle text input - ADD UNIQUE KEY
-        if user_query := st.chat_input("Type your message...", key="main_chat_input"):
-            self._process_query(user_query)
-            st.rerun()
+        user_query = st.chat_input("Type your message...", key="main_chat_input")
+
+        # The new turn is drawn right below the existing history, so no
+        # st.rerun() is needed (it would re-render every prior message again).
+        query = voice_query or user_query
+        if query:
+            self._process_query(query)
 
     # ===== GATEWAY/LOGIN RENDERING =====
     def _render_gateway(self):
@@ -1159,6 +1400,9 @@ class StreamlitApp:
                 # default landings
                 st.session_state["sidebar_nav"] = "Dashboard"
 
+                if role == "tenant":
+                    self._restore_chat_history()
+
                 st.toast(f"✅ Logged in as {role.title()}")
                 st.rerun()
             else:
@@ -1393,6 +1637,146 @@ class StreamlitApp:
             st.markdown("---")
 
     # ===== MAIN APP RUNNER =====
+    # ===== VIEWS =====
+    def _render_agent_dashboard(self):
+        st.markdown("### Agent Dashboard")
+
+        listings_tab, agreements_tab = st.tabs(["📋 Listings", "📄 Tenancy Agreements"])
+        # Both tabs render on every run, so fetch their data in one concurrent round
+        props, agreements = self._fetch_agent_dashboard_data(limit=200)
+
+        with listings_tab:
+
+            if not props:
+                st.warning("No properties available from backend yet.")
+            else:
+                raw_df = pd.json_normalize(props)
+                raw_df = self._clean_df_for_display(raw_df)
+
+                # Preferred / ordered columns for the listings table
+                preferred_cols = [
+                    "address", "rent", "property_type",
+                    "num_bedrooms", "num_bathrooms", "bedrooms",
+                    "sqft", "rent_psf", "mrt_info", "listing_status",
+                    "property_id", "title", "name",
+                    "district", "area", "neighborhood",
+                    "price", "monthly_rent", "rent", "bedrooms",
+                    "beds", "bathrooms", "size_sqft", "size_sqm",
+                    "mrt_distance_mins", "distance_mrt",
+                    "available_from", "created_at", "updated_at",
+                ]
+
+                preferred_cols = [c for c in preferred_cols if c in raw_df.columns]
+
+                seen = set()
+                ordered_cols = []
+                for c in preferred_cols:
+                    if c not in seen:
+                        ordered_cols.append(c)
+                        seen.add(c)
+
+                other_cols = [c for c in raw_df.columns if c not in ordered_cols]
+
+                display_df = raw_df[ordered_cols + other_cols] if ordered_cols else raw_df
+
+                st.dataframe(
+                    display_df,
+                    width="stretch",
+                    hide_index=True,
+                )
+
+                # Optional CSV export (encoded only when the button is clicked)
+                st.download_button(
+                    "Download Listings CSV",
+                    data=lambda: display_df.to_csv(index=False).encode("utf-8"),
+                    file_name="listings_export.csv",
+                    mime="text/csv",
+                    use_container_width=True,
+                )
+
+        with agreements_tab:
+            st.markdown("#### Tenancy Agreements")
+
+            if not agreements:
+                st.info("No tenancy agreements found yet.")
+            else:
+                self._render_tenancy_agreements_cards(agreements)
+
+                agreements_df = pd.json_normalize(agreements)
+                agreements_df = self._clean_df_for_display(agreements_df)
+
+                preferred_ag_cols = [
+                    "id", "agreement_id",
+                    "property_id", "property.title", "property.address",
+                    "tenant_id", "tenant_email",
+                    "status", "start_date", "end_date",
+                    "monthly_rent", "deposit_amount",
+                    "created_at", "updated_at",
+                ]
+                ordered_ag_cols = [c for c in preferred_ag_cols if c in agreements_df.columns]
+                other_ag_cols = [c for c in agreements_df.columns if c not in ordered_ag_cols]
+                agreements_display = agreements_df[ordered_ag_cols + other_ag_cols] if ordered_ag_cols else agreements_df
+
+                # Optional CSV export (encoded only when the button is clicked)
+                st.download_button(
+                    "Download Agreements CSV",
+                    data=lambda: agreements_display.to_csv(index=False).encode("utf-8"),
+                    file_name="tenancy_agreements_export.csv",
+                    mime="text/csv",
+                    use_container_width=True,
+                    key="download_agreements_btn",
+                )
+
+    def _render_agent_profile_page(self):
+        auth = st.session_state.get("auth", {}) or {}
+        active_role = st.session_state.get("active_role", "agent")
+        st.markdown("## Account")
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.metric("Role", active_role.title())
+        with c2:
+            st.metric("Email", auth.get("email") or "—")
+        with c3:
+            st.metric("User ID", auth.get("user_id") or "—")
+
+        st.markdown(f"**User Type:** `{auth.get('user_type') or '—'}`")
+
+    def _render_tenant_dashboard(self):
+        auth = st.session_state.get("auth", {}) or {}
+        user_id = auth.get("user_id")
+        st.markdown("### Tenant Dashboard")
+        st.markdown("#### 🏠 Property Preferences")
+        prefs = self._fetch_tenant_preferences(user_id=user_id)
+        self._render_preferences_cards(prefs)
+
+    @st.fragment
+    def _render_conversations(self):
+        # Chat turns rerun only this fragment, not the sidebar and page chrome
+        self._display_chat_history()
+        self._handle_user_input()
+
+    def _render_tenant_profile_page(self):
+        auth = st.session_state.get("auth", {}) or {}
+        user_id = auth.get("user_id")
+        active_role = st.session_state.get("active_role", "tenant")
+
+        st.markdown("## Account")
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.metric("Role", active_role.title())
+        with c2:
+            st.metric("Email", auth.get("email") or "—")
+        with c3:
+            st.metric("User ID", user_id or "—")
+
+        st.markdown(f"**User Type:** `{auth.get('user_type') or '—'}`")
+
+        st.markdown("---")
+        st.markdown("### Tenant Profile")
+
+        profile = self._fetch_tenant_profile(user_id=user_id)
+        self._render_tenant_profile_card(profile)
+
     def run(self):
         screen = st.session_state.get("screen", "gateway")
         role = st.session_state.get("active_role")
@@ -1417,156 +1801,28 @@ class StreamlitApp:
             st.session_state["screen"] = "gateway"
             st.session_state["active_role"] = None
             st.session_state["auth"] = {"logged_in": False, "email": None}
+            st.session_state.pop("conversation_id", None)
+            st.session_state.pop("chat_memory", None)
             st.rerun()
             
-        # 5) Agent flow
-        if role == "agent":
-            if nav == "Dashboard":
-                st.markdown("### Agent Dashboard")
-
-                listings_tab, agreements_tab = st.tabs(["📋 Listings", "📄 Tenancy Agreements"])
-
-                with listings_tab:
-                    props = self._fetch_properties(limit=200, offset=0)
-
-                    if not props:
-                        st.warning("No properties available from backend yet.")
-                    else:
-                        raw_df = pd.json_normalize(props)
-                        raw_df = self._clean_df_for_display(raw_df)
-
-                        # Preferred / ordered columns for the listings table
-                        preferred_cols = [
-                            "address", "rent", "property_type",
-                            "num_bedrooms", "num_bathrooms", "bedrooms",
-                            "sqft", "rent_psf", "mrt_info", "listing_status",
-                            "property_id", "title", "name",
-                            "district", "area", "neighborhood",
-                            "price", "monthly_rent", "rent", "bedrooms",
-                            "beds", "bathrooms", "size_sqft", "size_sqm",
-                            "mrt_distance_mins", "distance_mrt",
-                            "available_from", "created_at", "updated_at",
-                        ]
-
-                        preferred_cols = [c for c in preferred_cols if c in raw_df.columns]
-
-                        seen = set()
-                        ordered_cols = []
-                        for c in preferred_cols:
-                            if c not in seen:
-                                ordered_cols.append(c)
-                                seen.add(c)
-
-                        other_cols = [c for c in raw_df.columns if c not in ordered_cols]
-
-                        display_df = raw_df[ordered_cols + other_cols] if ordered_cols else raw_df
-
-                        st.dataframe(
-                            display_df,
-                            width="stretch",
-                            hide_index=True,
-                        )
-
-                        # Optional CSV export
-                        csv = display_df.to_csv(index=False).encode("utf-8")
-                        st.download_button(
-                            "Download Listings CSV",
-                            data=csv,
-                            file_name="listings_export.csv",
-                            mime="text/csv",
-                            use_container_width=True,
-                        )
-                
-                with agreements_tab:
-                    st.markdown("#### Tenancy Agreements")
-
-                    agreements = self._fetch_tenancy_agreements(limit=200, offset=0)
-
-                    if not agreements:
-                        st.info("No tenancy agreements found yet.")
-                    else:
-                        self._render_tenancy_agreements_cards(agreements)
-
-                        agreements_df = pd.json_normalize(agreements)
-                        agreements_df = self._clean_df_for_display(agreements_df)
-
-                        preferred_ag_cols = [
-                            "id", "agreement_id",
-                            "property_id", "property.title", "property.address",
-                            "tenant_id", "tenant_email",
-                            "status", "start_date", "end_date",
-                            "monthly_rent", "deposit_amount",
-                            "created_at", "updated_at",
-                        ]
-                        ordered_ag_cols = [c for c in preferred_ag_cols if c in agreements_df.columns]
-                        other_ag_cols = [c for c in agreements_df.columns if c not in ordered_ag_cols]
-                        agreements_display = agreements_df[ordered_ag_cols + other_ag_cols] if ordered_ag_cols else agreements_df
-
-                        # Optional CSV export
-                        csv_ag = agreements_display.to_csv(index=False).encode("utf-8")
-                        st.download_button(
-                            "Download Agreements CSV",
-                            data=csv_ag,
-                            file_name="tenancy_agreements_export.csv",
-                            mime="text/csv",
-                            use_container_width=True,
-                            key="download_agreements_btn",
-                        )
-
-            elif nav == "Profile":
-                auth = st.session_state.get("auth", {}) or {}
-                active_role = st.session_state.get("active_role", "agent")
-                st.markdown("## Account")
-                c1, c2, c3 = st.columns(3)
-                with c1:
-                    st.metric("Role", active_role.title())
-                with c2:
-                    st.metric("Email", auth.get("email") or "—")
-                with c3:
-                    st.metric("User ID", auth.get("user_id") or "—")
-
-                st.markdown(f"**User Type:** `{auth.get('user_type') or '—'}`")
-
-         # 6) Tenant flow
-        elif role == "tenant":
-            auth = st.session_state.get("auth", {}) or {}
-            user_id = auth.get("user_id")
-
-            # DASHBOARD VIEWING
-            if nav == "Dashboard":
-                st.markdown("### Tenant Dashboard")
-                st.markdown("#### 🏠 Property Preferences")
-                prefs = self._fetch_tenant_preferences(user_id=user_id)
-                self._render_preferences_cards(prefs)
-
-            # CONVERSATIONS VIEWING
-            elif nav == "Conversations":
-                self._display_chat_history()
-                self._handle_user_input()
-
-            # PROFILE VIEWING
-            elif nav == "Profile":
-                active_role = st.session_state.get("active_role", "tenant")
-
-                st.markdown("## Account")
-                c1, c2, c3 = st.columns(3)
-                with c1:
-                    st.metric("Role", active_role.title())
-                with c2:
-                    st.metric("Email", auth.get("email") or "—")
-                with c3:
-                    st.metric("User ID", user_id or "—")
-
-                st.markdown(f"**User Type:** `{auth.get('user_type') or '—'}`")
-
-                st.markdown("---")
-                st.markdown("### Tenant Profile")
-
-                profile = self._fetch_tenant_profile(user_id=user_id)
-                self._render_tenant_profile_card(profile)
+        # 5) Role-specific view for the selected nav entry
+        renderers = {
+            "agent": {
+                "Dashboard": self._render_agent_dashboard,
+                "Profile": self._render_agent_profile_page,
+            },
+            "tenant": {
+                "Dashboard": self._render_tenant_dashboard,
+                "Conversations": self._render_conversations,
+                "Profile": self._render_tenant_profile_page,
+            },
+        }
+        render = renderers.get(role, {}).get(nav)
+        if render:
+            render()
 
 # ===== APP ENTRY POINT =====
 if __name__ == "__main__":
-    load_dotenv()
+    ensure_dotenv()
     app = StreamlitApp()
     app.run()
\ No newline at end of file
@@ -1,5 +1,5 @@
 """Configuration management module."""
 
-from .config_manager import ConfigManager
+from .config_manager import ConfigManager, ensure_dotenv, secrets_file_exists
 
-__all__ = ['ConfigManager']
+__all__ = ['ConfigManager', 'ensure_dotenv', 'secrets_file_exists']
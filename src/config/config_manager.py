@@ -1,17 +1,40 @@
 import os
+from functools import lru_cache
 import streamlit as st
 from dotenv import load_dotenv
 
-class ConfigManager:
-    """Manages application configuration and environment variables."""
-    
-    def __init__(self):
+_DOTENV_LOADED = False
+
+
+def ensure_dotenv() -> None:
+    """Load .env into os.environ once per process (Streamlit re-executes the script on every rerun)."""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
         load_dotenv()
-        self.api_key = self._load_api_key()
-    
-    def _load_api_key(self) -> str:
-        """Load and validate OpenAI API key from environment or Streamlit secrets."""
-        # Try Streamlit secrets first (for deployed apps)
+        _DOTENV_LOADED = True
+
+
+def secrets_file_exists() -> bool:
+    """
+    Whether Streamlit found and parsed a secrets.toml, i.e. whether reading
+    st.secrets can succeed. Streamlit does the lookup itself, so every
+    location it is configured with (the `secrets.files` option) counts.
+    """
+    try:
+        return st.secrets.load_if_toml_exists()
+    except Exception as e:
+        # A secrets file exists but is malformed; fall back to the environment
+        print(f"[config] Could not load Streamlit secrets: {e}")
+        return False
+
+
+@lru_cache(maxsize=1)
+def _load_api_key() -> str:
+    """Load and validate OpenAI API key from environment or Streamlit secrets (once per process)."""
+    ensure_dotenv()
+
+    # Try Streamlit secrets first (for deployed apps); skip when no secrets file exists
+    if secrets_file_exists():
         try:
             api_key = st.secrets["openai"]["api_key"]
             if api_key and api_key.strip() and api_key != "your_openai_api_key_here":
@@ -22,16 +45,24 @@ class ConfigManager:
                 return api_key
         except (KeyError, FileNotFoundError, AttributeError):
             pass
-        
-        # Fall back to environment variable (for local development)
-        api_key = os.getenv("OPENAI_API_KEY")
-        if api_key and api_key.strip():
-            return api_key.strip()
-        
-        st.error("🔑 OpenAI API key not found. Please configure it in either:")
-        st.error("• .env file (OPENAI_API_KEY=your_key)")
-        st.error("• .streamlit/secrets.toml ([openai] api_key='your_key')")
-        st.stop()
+    
+    # Fall back to environment variable (for local development)
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key and api_key.strip():
+        return api_key.strip()
+    
+    # st.stop() raises, so a missing key is never memoized
+    st.error("🔑 OpenAI API key not found. Please configure it in either:")
+    st.error("• .env file (OPENAI_API_KEY=your_key)")
+    st.error("• .streamlit/secrets.toml ([openai] api_key='your_key')")
+    st.stop()
+
+
+class ConfigManager:
+    """Manages application configuration and environment variables."""
+    
+    def __init__(self):
+        self.api_key = _load_api_key()
     
     def get_debug_mode(self) -> bool:
         """Get debug mode setting."""
@@ -41,4 +72,4 @@ class ConfigManager:
     def get_environment(self) -> str:
         """Get current environment setting."""
         # Fall back to environment variable since we simplified secrets.toml
-        return os.getenv("ENVIRONMENT", "development")
\ No newline at end of file
+        return os.getenv("ENVIRONMENT", "development")
@@ -1,7 +1,23 @@
 """Core business logic module."""
 
-from .chatbot_engine import ChatbotEngine
-from .agent import CasaAmigoAgent
-from .document_manager import DocumentIndexManager
+# Submodules are imported on first attribute access, so importing a light
+# subpackage (e.g. core.config from the FastAPI backend) does not pull in
+# llama_index, openai and streamlit.
+_LAZY_EXPORTS = {
+    'ChatbotEngine': '.chatbot_engine',
+    'CasaAmigoAgent': '.agent',
+    'AgentConfig': '.agent',
+    'DocumentIndexManager': '.document_manager',
+}
 
-__all__ = ['ChatbotEngine', 'DocumentIndexManager', 'CasaAmigoAgent']
\ No newline at end of file
+__all__ = ['ChatbotEngine', 'DocumentIndexManager', 'CasaAmigoAgent', 'AgentConfig']
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value  # later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
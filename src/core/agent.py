@@ -9,24 +9,45 @@ Role of this module
 - Capture useful debug info for display in the app.
 
 Design notes
-- We bind a single CallbackManager (with a debug handler) at the LLM
-  and at global Settings. This way, retrievers/query-engines created
-  elsewhere (e.g., inside build_tools) still emit traces.
-- We keep memory simple (token-limited buffer). 
+- In verbose mode we bind a single CallbackManager (with a debug handler)
+  at the LLM and pass it explicitly into build_tools, so the tools'
+  retrievers/query-engines emit traces too. The global llama_index
+  Settings are never mutated, so agents don't affect each other.
+- We keep memory simple (token-limited buffer). It lives in
+  st.session_state, so one cached agent can serve many sessions.
+- Identical turns (same user, day, history and message) are answered from an
+  on-disk response cache, if the turn only used read-only tools.
 """
 
+import logging
+from collections import namedtuple
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Optional
 
+import streamlit as st
 from llama_index.llms.openai import OpenAI
 from llama_index.core.agent.workflow import AgentWorkflow
 from llama_index.core.memory import ChatMemoryBuffer
-from llama_index.core import VectorStoreIndex, Settings
-from llama_index.core.callbacks import CallbackManager, LlamaDebugHandler
+from llama_index.core.llms import ChatMessage
+from llama_index.core import VectorStoreIndex
+from llama_index.core.callbacks import CallbackManager
 
-from utils.prompts import SYSTEM_ROUTING_PROMPT
-from utils.tool_registry import build_tools
+from .memory import IncrementalChatMemory
+
+from utils.prompts import SYSTEM_ROUTING_PROMPT, DATETIME_NOTE_RE, current_datetime_note
+from utils.tool_registry import build_tools, format_args
 from utils.utils import run_sync, extract_text
+from utils import response_cache
+
+logger = logging.getLogger(__name__)
+
+# One recorded tool call from the last turn (turned into dicts only for the debug panel)
+ToolCallRec = namedtuple("ToolCallRec", "i name args args_pretty")
+
+# Read-only tools: a turn is cached only if every tool it called is listed
+# here, so a new tool (or one with side effects) is never replayed by default
+_CACHEABLE_TOOLS = {"lease_qna", "neighborhood_researcher"}
 
 
 @dataclass
@@ -47,17 +68,42 @@ class CasaAmigoAgent:
       - chat(message: str) -> str
       - get_tool_calls() -> list[dict]      # for debug panel
       - get_trace_tree() -> str | None      # logtrace when required, if available
+
+    Construction builds the LLM, tools and workflow, so it is expensive.
+    Create one instance per process (the app does this via st.cache_resource
+    in `get_chatbot`); per-session state such as memory lives in
+    st.session_state, not on the instance. Anything that changes over time
+    (such as the current datetime) must not be captured at construction; it
+    is computed in `chat()` and sent with each turn.
     """
 
-    def __init__(self, index: VectorStoreIndex, api_key: str, config: Optional[AgentConfig] = None):
+    # Session-state key of the last turn's tool calls (debug panel). The agent
+    # instance is shared by all sessions, so per-turn state can't live on it.
+    _TOOL_CALLS_KEY = "agent_last_tool_calls"
+
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        api_key: str,
+        config: Optional[AgentConfig] = None,
+        index_version: str = "",
+    ):
         self.config = config or AgentConfig()
+        # Part of response cache keys, so answers from an older index aren't replayed
+        self.index_version = index_version
 
         # ---- Debug / tracing: one manager everywhere ------------------------
-        # Prints a concise tree after each agent run (to stdout).
-        self._debug_handler = LlamaDebugHandler(print_trace_on_end=True)
-        self._cb_manager = CallbackManager([self._debug_handler])
-        # Ensure retrievers/query engines created elsewhere inherit callbacks.
-        Settings.callback_manager = self._cb_manager
+        if self.config.verbose:
+            # Debug-only dependency, imported when actually needed
+            from llama_index.core.callbacks import LlamaDebugHandler
+
+            # Prints a concise tree after each agent run (to stdout).
+            self._debug_handler = LlamaDebugHandler(print_trace_on_end=True)
+            self._cb_manager = CallbackManager([self._debug_handler])
+        else:
+            # No event recording or trace printing outside debug mode
+            self._debug_handler = None
+            self._cb_manager = CallbackManager([])
 
         # ---- LLM -------------------------------------------------------------
         self.llm = OpenAI(
@@ -76,7 +122,8 @@ class CasaAmigoAgent:
             index, 
             similarity_top_k=self.config.similarity_top_k,
             llm_client=self.openai_client, # Share the client,
-            llm=self.llm
+            llm=self.llm,
+            callback_manager=self._cb_manager,
         )
 
         # ---- AgentWorkflow ---------------------------------------------------
@@ -87,14 +134,17 @@ class CasaAmigoAgent:
             system_prompt=SYSTEM_ROUTING_PROMPT,
         )
 
-        # ---- Memory ----------------------------------------------------------
-        self.memory = ChatMemoryBuffer.from_defaults(
-            token_limit=self.config.memory_token_limit,
-            llm=self.llm,
-        )
+    # ---- Memory --------------------------------------------------------------
 
-        # ---- Debug buffers (for UI display) ---------------------------------
-        self._last_tool_calls: list[dict] = []
+    @property
+    def memory(self) -> ChatMemoryBuffer:
+        """Per-session chat memory, kept in st.session_state across reruns."""
+        if "chat_memory" not in st.session_state:
+            st.session_state["chat_memory"] = IncrementalChatMemory.from_defaults(
+                token_limit=self.config.memory_token_limit,
+                llm=self.llm,
+            )
+        return st.session_state["chat_memory"]
 
 
     # ------------------------------ Public API -------------------------------
@@ -110,33 +160,65 @@ class CasaAmigoAgent:
         # ✅ Store auth in global store BEFORE running async workflow
         if auth:
             from utils.auth_store import get_auth_store
-            print(f"[AGENT] Storing auth globally: user_id={auth.get('user_id')}, has_token={bool(auth.get('token'))}")
+            logger.debug("Storing auth globally: user_id=%s, has_token=%s", auth.get("user_id"), bool(auth.get("token")))
             get_auth_store().set(auth)
+
+        # The agent outlives any one day, so the current time is sent with
+        # every turn rather than fixed in the prompt or tools at build time
+        now = datetime.now()
+        turn_message = f"{current_datetime_note(now)}\n{message}"
+
+        # Replay an identical earlier turn (same day) from the response cache.
+        # Notes are stripped from the history so follow-up turns can still hit.
+        memory = self.memory
+        cache_key = response_cache.make_key(
+            SYSTEM_ROUTING_PROMPT,
+            self.index_version,
+            now.date().isoformat(),
+            (auth or {}).get("user_id"),
+            DATETIME_NOTE_RE.sub("", response_cache.history_fingerprint(memory.get_all())),
+            message,
+        )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("response cache hit")
+            st.session_state[self._TOOL_CALLS_KEY] = []
+            memory.put(ChatMessage(role="user", content=turn_message))
+            memory.put(ChatMessage(role="assistant", content=cached))
+            return cached
         
         # Run the async workflow
-        out = run_sync(self.workflow, message, self.memory, max_iterations=6)
+        out = run_sync(self.workflow, turn_message, memory, max_iterations=6)
 
-        # Captures tool calls for debug panel 
-        self._last_tool_calls = []
-        tool_calls = getattr(out, "tool_calls", None) or getattr(out, "tool_execs", None)
+        # Captures tool calls for this turn (local: other sessions share the agent)
+        calls: list[ToolCallRec] = []
+        tool_calls = getattr(out, "tool_calls", None)
+        if tool_calls is None:
+            tool_calls = getattr(out, "tool_execs", None)
         if tool_calls:
             for i, tc in enumerate(tool_calls):
                 name = getattr(tc, "tool_name", None) or getattr(tc, "name", None)
                 args = getattr(tc, "input", None) or getattr(tc, "tool_input", None)
-                self._last_tool_calls.append(
-                    {"i": i, "name": str(name), "args": args if isinstance(args, dict) else str(args)}
+                calls.append(
+                    ToolCallRec(i, str(name), args if isinstance(args, dict) else str(args), format_args(args))
                 )
-                print(f"[agent] tool_call[{i}] name={name} args={args}")
+                logger.debug("tool_call[%d] name=%s args=%s", i, name, args)
         else:
-            print("[agent] no tool calls recorded")
+            logger.debug("no tool calls recorded")
+
+        st.session_state[self._TOOL_CALLS_KEY] = calls  # for the debug panel
 
-        return extract_text(out)
+        text = extract_text(out)
+        # Only when the output says which tools ran (an unknown run is never cached)
+        if tool_calls is not None and all(c.name in _CACHEABLE_TOOLS for c in calls):
+            response_cache.set(cache_key, text)
+        return text
 
     # ------------------------------ Debug helpers ----------------------------
 
     def get_tool_calls(self) -> list[dict]:
-        """Return the last tool-call list (for Streamlit debug panel)."""
-        return list(self._last_tool_calls)
+        """Return this session's last tool-call list as dicts (for Streamlit debug panel)."""
+        return [tc._asdict() for tc in st.session_state.get(self._TOOL_CALLS_KEY, [])]
 
     def get_trace_tree(self) -> Optional[str]:
         """Return a pretty trace tree if the debug handler provides one."""
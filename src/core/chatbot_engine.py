@@ -1,31 +1,109 @@
 
 """Chatbot engine for the Casa Amigo application."""
 
+from typing import Iterator
+
+import streamlit as st
 from llama_index.core import VectorStoreIndex
 from llama_index.core.memory import ChatMemoryBuffer
+from llama_index.core.llms import ChatMessage
 from llama_index.llms.openai import OpenAI
 
+from .memory import IncrementalChatMemory
+
+from utils import response_cache
+
 
 class ChatbotEngine:
-    """Handles chatbot functionality and LLM interactions."""
+    """
+    Handles chatbot functionality and LLM interactions.
+
+    The instance (LLM + index) can be shared process-wide via st.cache_resource;
+    memory and the chat engine bound to it are kept per session in st.session_state.
+    """
     
-    def __init__(self, index: VectorStoreIndex, api_key: str):
+    def __init__(self, index: VectorStoreIndex, api_key: str, index_version: str = ""):
         self.index = index
+        # Part of response cache keys, so answers from an older index aren't replayed
+        self.index_version = index_version
         self.api_key = api_key
         self.llm = OpenAI(model="gpt-4o-mini", api_key=api_key, temperature=0.1)
-        self.memory = ChatMemoryBuffer.from_defaults(token_limit=2000)
-        self.chat_engine = self._create_chat_engine()
+
+    @property
+    def memory(self) -> ChatMemoryBuffer:
+        """This session's chat memory, created on first use."""
+        if "chat_engine_memory" not in st.session_state:
+            st.session_state["chat_engine_memory"] = IncrementalChatMemory.from_defaults(token_limit=2000, llm=self.llm)
+        return st.session_state["chat_engine_memory"]
+
+    @property
+    def chat_engine(self):
+        """This session's chat engine; built once and bound to the session's memory."""
+        if "chat_engine" not in st.session_state:
+            st.session_state["chat_engine"] = self._create_chat_engine()
+        return st.session_state["chat_engine"]
+
+    @staticmethod
+    def reset_session():
+        """Forget this session's conversation (memory and the engine bound to it)."""
+        st.session_state.pop("chat_engine_memory", None)
+        st.session_state.pop("chat_engine", None)
     
     def _create_chat_engine(self):
         """Create and configure the chat engine."""
+        # "context" retrieves for the raw message and answers in one LLM call
+        # (condense_question spent an extra call rewriting the question first)
         return self.index.as_chat_engine(
-            chat_mode="condense_question",
+            chat_mode="context",
             llm=self.llm,
             memory=self.memory,
+            similarity_top_k=5,
             verbose=True
         )
     
+    def _cache_key(self, query: str) -> str:
+        # Case/whitespace-insensitive on the prompt; the history still has to match
+        normalized = " ".join(query.split()).lower()
+        return response_cache.make_key(
+            "chatbot_engine",
+            self.index_version,
+            response_cache.history_fingerprint(self.memory.get_all()),
+            normalized,
+        )
+
+    def _replay_cached(self, query: str, cached: str):
+        """Record a cached turn in memory, as the chat engine would have."""
+        self.memory.put(ChatMessage(role="user", content=query))
+        self.memory.put(ChatMessage(role="assistant", content=cached))
+
     def get_response(self, query: str) -> str:
-        """Get chatbot response for a given query."""
+        """Get chatbot response for a given query (cached for identical turns)."""
+        cache_key = self._cache_key(query)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            self._replay_cached(query, cached)
+            return cached
+
         response = self.chat_engine.chat(query)
+        response_cache.set(cache_key, response.response)
         return response.response
+
+    def stream_response(self, query: str) -> Iterator[str]:
+        """
+        Yield the chatbot response token by token as the LLM produces it.
+        A cached identical turn is yielded whole, without retrieval or an LLM call.
+        """
+        cache_key = self._cache_key(query)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            self._replay_cached(query, cached)
+            yield cached
+            return
+
+        streaming_response = self.chat_engine.stream_chat(query)
+        tokens = []
+        for token in streaming_response.response_gen:
+            tokens.append(token)
+            yield token
+        # Only complete replies are cached (a broken stream raises before this)
+        response_cache.set(cache_key, "".join(tokens))
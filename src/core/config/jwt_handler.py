@@ -1,8 +1,14 @@
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Tuple
+import hashlib
+import threading
+import time
+import jwt
+from jwt import PyJWTError
+from jwt.algorithms import HMACAlgorithm
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
 
@@ -22,41 +28,86 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 security = HTTPBearer()
 
 
+# One reusable PyJWT instance (module-level jwt.encode/decode build a new one
+# per call), with the secret turned into HMAC key bytes once
+_jwt = jwt.PyJWT()
+_SIGNING_KEY = HMACAlgorithm(HMACAlgorithm.SHA256).prepare_key(SECRET_KEY)
+
+# Verified tokens -> (user_id, exp). Keyed by the token's SHA-256 digest so raw
+# tokens are never kept as keys; only successfully verified tokens are stored.
+TOKEN_CACHE_MAX_SIZE = 4096
+TOKEN_CACHE_MIN_TTL_SECONDS = 5  # tokens about to expire are verified but not cached
+_token_cache: "OrderedDict[bytes, Tuple[UUID, float]]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
 def create_access_token(user_id: UUID, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token for a user."""
-    to_encode = {"sub": str(user_id)}
-    
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    
-    to_encode.update({"exp": expire})
-    
+    # Integer epoch seconds, as JWT "exp" expects; no datetime round-trip
+    ttl = int(expires_delta.total_seconds()) if expires_delta else ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    to_encode = {"sub": str(user_id), "exp": int(time.time()) + ttl}
+
     try:
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        return encoded_jwt
+        return _jwt.encode(to_encode, _SIGNING_KEY, algorithm=ALGORITHM)
     except Exception as e:
         raise ValueError(f"Failed to create token: {str(e)}")
 
 
-def verify_token(token: str) -> Optional[UUID]:
-    """Verify JWT token and return user_id if valid."""
+def _decode_token(token: str) -> Optional[Tuple[UUID, float]]:
+    """Verify the signature and return (user_id, exp timestamp), or None if invalid."""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+        payload = _jwt.decode(token, _SIGNING_KEY, algorithms=[ALGORITHM])
+    except PyJWTError:
+        return None
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        return None
+    exp = payload.get("exp")
+    return UUID(user_id), float(exp) if exp is not None else float("inf")
+
+
+def verify_token(token: str) -> Optional[UUID]:
+    """Verify JWT token and return user_id if valid (cached until the token expires)."""
+    key = hashlib.sha256(token.encode()).digest()
+
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            user_id, exp = cached
+            if exp > time.time():
+                _token_cache.move_to_end(key)
+                return user_id
+            # Expired: drop it; the token is no longer valid anyway
+            del _token_cache[key]
             return None
-        return UUID(user_id)
-    except JWTError:
+
+    decoded = _decode_token(token)
+    if decoded is None:
         return None
+    if decoded[1] - time.time() <= TOKEN_CACHE_MIN_TTL_SECONDS:
+        return decoded[0]
+
+    with _token_cache_lock:
+        _token_cache[key] = decoded
+        _token_cache.move_to_end(key)
+        if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+    return decoded[0]
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UUID:
+async def get_current_user(
+    request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UUID:
     """
     Dependency to extract and verify user from JWT token.
-    Use this on protected endpoints.
+    Use this on protected endpoints as `Depends(get_current_user)`; FastAPI
+    resolves it once per request, and the verified id is kept on
+    `request.state.user_id` for anything else handling the same request.
     """
+    user_id = getattr(request.state, "user_id", None)
+    if user_id is not None:
+        return user_id
+
     token = credentials.credentials
     user_id = verify_token(token)
     
@@ -66,5 +117,6 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid or expired token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    request.state.user_id = user_id
     return user_id
\ No newline at end of file
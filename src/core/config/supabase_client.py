@@ -1,9 +1,11 @@
 from supabase import create_client, Client
+import requests
 from requests.exceptions import RequestException
-from typing import Optional
+from functools import lru_cache
+from typing import ClassVar, Optional, Tuple
 import os
+import threading
 from dotenv import load_dotenv
-import streamlit as st
 
 
 # ----------------- Custom Exceptions -----------------
@@ -19,37 +21,91 @@ class SupabaseConnectionError(SupabaseError):
     """Raised when unable to connect to Supabase service."""
 
 
+# Set once the opt-in startup probe has passed, so later clients skip it
+_HEALTHY: bool = False
+
+
+# ----------------- Credentials -----------------
+@lru_cache(maxsize=1)
+def _get_credentials() -> Tuple[Optional[str], Optional[str]]:
+    """Resolve (url, anon_key) once per process: env vars first, then Streamlit secrets."""
+
+    # 1. Load .env file (good for local testing)
+    load_dotenv()
+
+    # 2. Environment variables (the only source on Render/FastAPI)
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_ANON_KEY")
+    if url and key:
+        return url, key
+
+    # 3. Fall back to Streamlit secrets. Imported here, so the backend (which
+    # has the env vars) never loads Streamlit or the Streamlit-side config package.
+    import streamlit as st
+    from config import secrets_file_exists
+
+    if secrets_file_exists():
+        try:
+            if "supabase" in st.secrets:
+                url = url or st.secrets["supabase"].get("url")
+                key = key or st.secrets["supabase"].get("anon_key")
+        except (KeyError, FileNotFoundError, AttributeError):
+            pass
+    return url, key
+
+
 # ----------------- Supabase Client Wrapper -----------------
 class SupabaseClient:
-    """Wrapper for Supabase client with robust credential handling."""
+    """Wrapper for Supabase client with robust credential handling.
+
+    Use `SupabaseClient.get()` to share one client (and its pooled HTTP
+    connections) across the whole process.
+    """
+
+    # Keep-alive pool for the shared client's HTTP connections
+    HTTP_MAX_KEEPALIVE = 20
+    HTTP_MAX_CONNECTIONS = 50
+    HTTP_TIMEOUT_SECONDS = 30
+
+    _instance: ClassVar[Optional["SupabaseClient"]] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self):
         self.client: Optional[Client] = None
+        self._url: Optional[str] = None
+        self._key: Optional[str] = None
         self._init_client()
 
-    def _init_client(self):
-        """Initialize Supabase client using environment variables as primary source."""
-
-        # 1. Load .env file (good for local testing)
-        load_dotenv()
-        
-        url = None
-        key = None
+    @classmethod
+    def get(cls) -> "SupabaseClient":
+        """Return the process-wide client, creating it on first use."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
 
-        # 2. Try to get secrets from Streamlit (if the code runs in a Streamlit context)
-        # We wrap this in a try block because accessing st.secrets itself can throw the error
+    def _client_options(self):
+        """Client options with a pooled keep-alive httpx client, if supabase-py supports injecting one."""
         try:
-            # We must check if 'st.secrets' is available and has the 'supabase' key
-            if "supabase" in st.secrets:
-                url = st.secrets["supabase"].get("url")
-                key = st.secrets["supabase"].get("anon_key")
-        except:
-            # If st.secrets isn't initialized (which is the case in FastAPI), ignore this block
-            pass 
+            import httpx
+            from supabase import ClientOptions
 
-        # 3. Fallback to Environment Variables (This is your primary source on Render)
-        url = url or os.getenv("SUPABASE_URL")
-        key = key or os.getenv("SUPABASE_ANON_KEY")
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_keepalive_connections=self.HTTP_MAX_KEEPALIVE,
+                    max_connections=self.HTTP_MAX_CONNECTIONS,
+                ),
+                timeout=self.HTTP_TIMEOUT_SECONDS,
+            )
+            return ClientOptions(httpx_client=http_client)
+        except (ImportError, TypeError):
+            # Older supabase-py: no httpx_client option; its own clients still keep connections alive
+            return None
+
+    def _init_client(self):
+        """Initialize Supabase client using environment variables as primary source."""
+        url, key = _get_credentials()
 
         # --- Validate credentials ---
         if not url or not key:
@@ -57,8 +113,12 @@ class SupabaseClient:
         
         # --- Initialize client ---
         try:
-            self.client = create_client(url, key)
-            self._test_connection()
+            options = self._client_options()
+            self.client = create_client(url, key, options=options) if options else create_client(url, key)
+            self._url, self._key = url, key
+            # No network probe by default: the first real query surfaces connection errors.
+            if os.getenv("SUPABASE_HEALTHCHECK") == "1":
+                self._startup_check()
         # ... (rest of your error handling remains the same)
         except (TypeError, ValueError) as e:
             raise SupabaseCredentialsError(f"Supabase URL or key invalid: {e}") from e
@@ -66,15 +126,26 @@ class SupabaseClient:
             raise SupabaseConnectionError(f"Failed to connect to Supabase service: {e}") from e
         except Exception as e:
             raise SupabaseConnectionError(f"Unexpected error initializing Supabase client: {e}") from e
-    def _test_connection(self):
-        """Optional simple test query to verify connectivity."""
-        if not self.client:
+    def _startup_check(self):
+        """Run the healthcheck at most once per process."""
+        global _HEALTHY
+        if _HEALTHY:
+            return
+        self.healthcheck()
+        _HEALTHY = True
+
+    def healthcheck(self, timeout: float = 5.0):
+        """Cheap connectivity check: HEAD on the REST root (no auth/JWT round-trip)."""
+        if not self.client or not self._url:
             raise SupabaseConnectionError("Supabase client not initialized.")
 
         try:
-            # This ensures the client can communicate with Supabase
-            self.client.auth.get_user()
+            resp = requests.head(
+                f"{self._url.rstrip('/')}/rest/v1/",
+                headers={"apikey": self._key, "Authorization": f"Bearer {self._key}"},
+                timeout=timeout,
+            )
         except RequestException as e:
-            raise SupabaseConnectionError("Supabase client created but connection test failed.") from e
-        except Exception as e:
-            raise SupabaseConnectionError(f"Unexpected error during Supabase connection test: {e}") from e
+            raise SupabaseConnectionError("Supabase connection test failed.") from e
+        if resp.status_code >= 500:
+            raise SupabaseConnectionError(f"Supabase connection test failed: HTTP {resp.status_code}")
@@ -1,35 +1,46 @@
+import asyncio
 import os
 import re
+import hashlib
+import pickle
+import shutil
+from itertools import chain
 import streamlit as st
 from llama_index.core import VectorStoreIndex, StorageContext, load_index_from_storage
-from llama_index.core.schema import TextNode
+from llama_index.core.schema import MetadataMode, TextNode
 from llama_index.core import SimpleDirectoryReader, Settings
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 # Ensure we always use the same embedding model for this index
 #Settings.embed_model = OpenAIEmbedding(model="text-embedding-3-large")
 
-# More forgiving clause detector, e.g.
-# "2(b) SECURITY DEPOSIT"
-# "2 (b) Security Deposit"
-# "Clause 5 (f) Option To Renew"
-CLAUSE_RE = re.compile(
+# Clause headers, matched at the start of a line (scanned over the whole
+# text with finditer). Whitespace is [^\S\r\n] so a header never spans lines.
+# - Numbered clause: optional "Clause", a label such as 5, 5(b), 5 (b) or
+#   2023(a), optional separators (spaces : . - –), then a title of up to
+#   101 characters starting with a letter, e.g. "2(b) SECURITY DEPOSIT",
+#   "2 (b) Security Deposit", "Clause 5 (f) Option To Renew".
+# - Lettered subclause: "(c)" plus whitespace, then an optional title, e.g.
+#   "(c) Repairs"; it belongs to the last numbered clause.
+HEADER_RE = re.compile(
     r"""(?imx)
-    ^\s*(?:Clause\s*)?                 # optional 'Clause'
-    (?P<label>\d{1,4}\s*\(?[a-zA-Z]?\)?)  # 5(b), 5 (b), 2023(a)
-    [\s:.\-–]*                         # separators / spaces
-    (?P<title>[A-Za-z][^\n\r]{0,100})  # up to 100 chars of title
-    """
-)
-
-SUBCLAUSE_RE = re.compile(
-    r"""(?imx)
-    ^\s*\((?P<letter>[a-z])\)\s+
-    (?P<title>[A-Za-z][^\n\r]{0,100})?
+    ^[^\S\r\n]*
+    (?:
+        (?:Clause[^\S\r\n]*)?
+        (?P<label>\d{1,4}[^\S\r\n]*\(?[a-zA-Z]?\)?)
+        (?:[^\S\r\n]|[:.\-–])*
+        (?P<title>[A-Za-z][^\n\r]{0,100})
+    |
+        \((?P<letter>[a-z])\)[^\S\r\n]+
+        (?P<sub_title>[A-Za-z][^\n\r]{0,100})?
+    )
     """
 )
 
 class DocumentIndexManager:
+    # Max embedding requests in flight while building the index
+    EMBED_CONCURRENCY = 5
+
     def __init__(
         self,
         pdf_path: str = None,
@@ -50,24 +61,51 @@ class DocumentIndexManager:
             )
         if persist_dir is None:
             persist_dir = os.path.join(
-                os.path.dirname(__file__), "..", "..", "pdf_index_v2"
+                os.path.dirname(__file__), "..", "..", "pdf_index_v3"
             )
 
 
         if embed_model is None:
             embed_model = OpenAIEmbedding(
-                model="text-embedding-3-large",
+                model="text-embedding-3-small",
+                dimensions=512,  # reduced output size: 3x smaller vectors than the full 1536
                 api_key=api_key,
+                embed_batch_size=100,  # clause texts per embeddings request
             )
 
         self.pdf_path = pdf_path
         self.persist_dir = persist_dir
         self.cache_version = cache_version
         self.embed_model = embed_model
+        self._index_version = None  # computed on first use
 
        
         self.index = self._load_or_build_index()
 
+    @property
+    def index_version(self) -> str:
+        """
+        Content hash of the persisted index (e.g. for response cache keys). It
+        changes whenever the index is rebuilt, in this process or a later one,
+        since the stored nodes and vectors change with the PDF or embedding model.
+        """
+        if self._index_version is None:
+            self._index_version = self._persisted_index_hash(self.persist_dir)
+        return self._index_version
+
+    @staticmethod
+    def _persisted_index_hash(persist_dir: str) -> str:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(persist_dir)):
+            path = os.path.join(persist_dir, name)
+            if not os.path.isfile(path):
+                continue
+            digest.update(name.encode())
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()
+
 
 
     # ---------- Clause-level splitting ----------
@@ -75,46 +113,169 @@ class DocumentIndexManager:
     
     def _split_into_clauses(self, text: str):
         """
-        Returns list of (label, title, body_text) for each clause.
-        We scan line-by-line looking for clause headers.
+        Returns list of (label, clause_num, title, body_text) for each clause.
+        Headers are found with one finditer pass; each body is the slice of
+        text between the end of its header line and the next header.
         """
-        lines = text.splitlines()
-        out, current = [], []
+        # Every line break (\r\n, \r, form feed, ...) becomes \n, so bodies
+        # never keep a trailing \r and headers are found on the same lines
+        text = "\n".join(text.splitlines())
+        out = []
         current_label, current_title = None, None
-
-        def flush():
-            nonlocal current, current_label, current_title
-            if current_label and current:
-                body = "\n".join(current).strip()
-                out.append((current_label, current_title or "", body))
-            current, current_label, current_title = [], None, None
-
         current_number = None  # e.g. "5"
+        body_start = None
 
-        for line in lines:
-            m_clause = CLAUSE_RE.match(line)
-            m_sub = SUBCLAUSE_RE.match(line) if not m_clause else None
+        def flush(end: int, last: bool = False):
+            # Only emit clauses with at least one line (even a blank one) after
+            # the header: text before the next header, or any line at the end
+            if current_label and body_start is not None and (body_start < end or last):
+                out.append((current_label, current_number, current_title or "", text[body_start:end].strip()))
 
-            if m_clause:
-                flush()
-                raw_label = re.sub(r"\s+", "", m_clause.group("label")).lower()
+        for m in HEADER_RE.finditer(text):
+            if m.group("label") is not None:
+                flush(m.start())
+                raw_label = re.sub(r"\s+", "", m.group("label")).lower()
                 current_number = re.match(r"\d+", raw_label).group(0)
                 current_label = raw_label                 # "5"
-                current_title = (m_clause.group("title") or "").strip(" -–:")
-            elif m_sub and current_number:
+                current_title = m.group("title").strip(" -–:")
+            elif current_number:
                 # New lettered subclause inside current_number
-                flush()
-                letter = m_sub.group("letter").lower()    # "c"
+                flush(m.start())
+                letter = m.group("letter").lower()    # "c"
                 current_label = f"{current_number}({letter})"   # "5(c)"
-                current_title = (m_sub.group("title") or "").strip(" -–:")
+                current_title = (m.group("sub_title") or "").strip(" -–:")
             else:
-                current.append(line)
-        
-        flush()  # flush last clause
+                # Lettered line before any numbered clause: plain text
+                continue
+
+            line_end = text.find("\n", m.end())
+            body_start = None if line_end == -1 else line_end + 1
+
+        flush(len(text), last=True)  # flush last clause
         return out
 
-            
+    # ---------- PDF -> clause nodes (cached on disk) ----------
+
+    def _read_pdf_pages(self, pdf_path: str):
+        """
+        Returns list of (page_text, page_label), one per page.
+        Uses PyMuPDF (C-backed) when installed, otherwise llama_index's pypdf reader.
+        """
+        try:
+            import pymupdf
+        except ImportError:
+            reader = SimpleDirectoryReader(input_files=[pdf_path])
+            return [(doc.text or "", doc.metadata.get("page_label")) for doc in reader.load_data()]
+
+        with pymupdf.open(pdf_path) as pdf:
+            # Same page_label convention as the pypdf reader: PDF label, else 1-based number
+            return [
+                (page.get_text("text") or "", page.get_label() or str(page.number + 1))
+                for page in pdf
+            ]
+
+    def _build_clause_nodes(self, pdf_path: str):
+        all_nodes = []
+        add_node = all_nodes.append
+        file_name = os.path.basename(pdf_path)
+
+        for text, page_label in self._read_pdf_pages(pdf_path):
+            # num is the bare clause number the splitter already parsed, e.g. "5(b)" -> "5"
+            for label, num, title, body in self._split_into_clauses(text):
+                enriched = f"Clause {label}: {title}\n\n{body}".strip()
+                meta = {
+                    "file_name": file_name,
+                    "clause_label": label,      # e.g. "5(b)"
+                    "clause_num": num,          # e.g. "5"
+                    "clause_title": title,      # e.g. "Option To Renew"
+                    # keep page label if present
+                    "page_label": page_label,
+                }
+                add_node(TextNode(text=enriched, metadata=meta))
+        return all_nodes
 
+    def _load_clause_nodes(self, pdf_path: str, persist_dir: str, cache_version: int):
+        """
+        Parsed clause nodes for the PDF, pickled next to the index and keyed by
+        the PDF's content hash + cache_version, so an unchanged PDF is never
+        re-parsed (only re-embedded) when the index is rebuilt.
+        """
+        with open(pdf_path, "rb") as f:
+            pdf_hash = hashlib.sha256(f.read()).hexdigest()
+        # Sibling of persist_dir: rebuild() wipes persist_dir itself
+        cache_dir = f"{persist_dir.rstrip(os.sep)}_nodes"
+        cache_path = os.path.join(cache_dir, f"nodes_{pdf_hash[:16]}_v{cache_version}.pkl")
+
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    nodes = pickle.load(f)
+                print(f"Loaded {len(nodes)} cached clause nodes from {cache_path}")
+                return nodes
+            except Exception as e:
+                print(f"Ignoring unreadable clause cache {cache_path}: {e}")
+
+        nodes = self._build_clause_nodes(pdf_path)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                pickle.dump(nodes, f)
+        except Exception as e:
+            print(f"Could not write clause cache {cache_path}: {e}")
+        return nodes
+
+    def _embed_nodes(self, nodes):
+        """
+        Embed nodes in place, issuing batches concurrently (at most
+        EMBED_CONCURRENCY requests in flight to stay under rate limits).
+        """
+        # Same text llama_index would embed: content plus embed-visible metadata
+        texts = [n.get_content(metadata_mode=MetadataMode.EMBED) for n in nodes]
+        batch_size = getattr(self.embed_model, "embed_batch_size", 100)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        async def embed_all():
+            sem = asyncio.Semaphore(self.EMBED_CONCURRENCY)
+
+            async def embed(batch):
+                async with sem:
+                    return await self.embed_model.aget_text_embedding_batch(batch)
+
+            return await asyncio.gather(*(embed(b) for b in batches))
+
+        for node, vec in zip(nodes, chain.from_iterable(asyncio.run(embed_all()))):
+            node.embedding = vec
+
+    # ---------- Vector store (FAISS binary when installed, else JSON) ----------
+
+    def _embed_dim(self) -> int:
+        dim = getattr(self.embed_model, "dimensions", None)
+        return dim or len(self.embed_model.get_text_embedding("dimension probe"))
+
+    def _new_storage_context(self) -> StorageContext:
+        """Storage for a fresh index: a flat FAISS index if faiss is installed."""
+        try:
+            import faiss
+            from llama_index.vector_stores.faiss import FaissVectorStore
+        except ImportError:
+            return StorageContext.from_defaults()
+
+        # OpenAI embeddings are unit-length, so inner product == cosine similarity
+        vector_store = FaissVectorStore(faiss_index=faiss.IndexFlatIP(self._embed_dim()))
+        return StorageContext.from_defaults(vector_store=vector_store)
+
+    def _load_storage_context(self, persist_dir: str) -> StorageContext:
+        """Storage for a persisted index, in whichever format it was written."""
+        store_path = os.path.join(persist_dir, "default__vector_store.json")
+        with open(store_path, "rb") as f:
+            is_json = f.read(1) == b"{"
+        if is_json:
+            # SimpleVectorStore (index built without faiss)
+            return StorageContext.from_defaults(persist_dir=persist_dir)
+
+        from llama_index.vector_stores.faiss import FaissVectorStore
+        vector_store = FaissVectorStore.from_persist_dir(persist_dir)
+        return StorageContext.from_defaults(vector_store=vector_store, persist_dir=persist_dir)
 
     @st.cache_resource
     def _cached_load_or_build_index(
@@ -125,37 +286,25 @@ class DocumentIndexManager:
         if os.path.exists(persist_dir):
 
  
-            storage_context = StorageContext.from_defaults(persist_dir=persist_dir)
-            index = load_index_from_storage(storage_context)
+            storage_context = _self._load_storage_context(persist_dir)
+            # Queries must be embedded with the model the index was built with
+            index = load_index_from_storage(storage_context, embed_model=_self.embed_model)
             print(f"Loaded existing index from {persist_dir}")
 
 
 
         else:
             print(f"Building new clause-aware index from {pdf_path}")
-            reader = SimpleDirectoryReader(input_files=[pdf_path])
-            docs = reader.load_data()
-            all_nodes = []
-
-            for doc in docs:
-                text = doc.text or ""
-                clauses = _self._split_into_clauses(text)
-                for label, title, body in clauses:
-                    enriched = f"Clause {label}: {title}\n\n{body}".strip()
-                    # extract bare number part from label, e.g. "5(b)" -> "5"
-                    mnum = re.match(r"(\d{1,4})", label)
-                    num = mnum.group(1) if mnum else None
-                    meta = {
-                        "file_name": os.path.basename(pdf_path),
-                        "clause_label": label,      # e.g. "5(b)"
-                        "clause_num": num,          # e.g. "5"
-                        "clause_title": title,      # e.g. "Option To Renew"
-                        # keep page label if present
-                        "page_label": doc.metadata.get("page_label"),
-                    }
-                    all_nodes.append(TextNode(text=enriched, metadata=meta))
-
-            index = VectorStoreIndex(all_nodes)
+            all_nodes = _self._load_clause_nodes(pdf_path, persist_dir, cache_version)
+
+            # Embed clause batches concurrently rather than one request after another;
+            # nodes that already carry an embedding are not re-embedded by the index
+            _self._embed_nodes(all_nodes)
+            index = VectorStoreIndex(
+                all_nodes,
+                storage_context=_self._new_storage_context(),
+                embed_model=_self.embed_model,
+            )
             index.storage_context.persist(persist_dir=persist_dir)
             print(f"✅ Built and persisted index with {len(all_nodes)} clause nodes")
         return index
@@ -167,17 +316,8 @@ class DocumentIndexManager:
 
     def rebuild(self):
         """Force rebuild."""
-        if os.path.exists(self.persist_dir):
-            for root, _, files in os.walk(self.persist_dir, topdown=False):
-                for f in files:
-                    try:
-                        os.remove(os.path.join(root, f))
-                    except Exception:
-                        pass
-                try:
-                    os.rmdir(root)
-                except Exception:
-                    pass
+        shutil.rmtree(self.persist_dir, ignore_errors=True)
         st.cache_resource.clear()
         self.cache_version += 1
+        self._index_version = None
         self.index = self._load_or_build_index()
@@ -0,0 +1,89 @@
+"""Chat memory with incremental token accounting."""
+
+from itertools import accumulate
+from typing import Any, List, Optional, Tuple
+
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.memory import ChatMemoryBuffer
+
+
+class IncrementalChatMemory(ChatMemoryBuffer):
+    """
+    ChatMemoryBuffer that tokenizes each message once.
+
+    The stock buffer re-tokenizes the remaining history on every trimming step
+    of every get(). Here per-message token counts are cached (aligned with the
+    stored history) and only messages added since the last call are tokenized;
+    get() then runs the stock trimming algorithm over the cached counts.
+
+    The stock buffer counts a window as the tokens of its contents joined by
+    " ", so each message is counted both as-is (first in the window) and with
+    the separating space (any later position). Totals match the stock count
+    for any tokenizer that doesn't merge tokens across that space.
+    """
+
+    # (tokens of content, tokens of " " + content) per stored message
+    _token_counts: List[Tuple[int, int]] = PrivateAttr(default_factory=list)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "IncrementalChatMemory"
+
+    def _counts_for(self, chat_history: List[ChatMessage]) -> List[Tuple[int, int]]:
+        counts = self._token_counts
+        if len(counts) > len(chat_history):
+            # History was replaced/shortened outside set()/reset(); start over
+            counts.clear()
+        for msg in chat_history[len(counts):]:
+            text = str(msg.content)
+            counts.append((len(self.tokenizer_fn(text)), len(self.tokenizer_fn(" " + text))))
+        return counts
+
+    def get(
+        self, input: Optional[str] = None, initial_token_count: int = 0, **kwargs: Any
+    ) -> List[ChatMessage]:
+        """Get chat history (same result as ChatMemoryBuffer.get)."""
+        chat_history = self.get_all()
+
+        if initial_token_count > self.token_limit:
+            raise ValueError("Initial token count exceeds token limit")
+
+        counts = self._counts_for(chat_history)
+        # spaced_suffix[i]: tokens of messages i.. when each follows a separator
+        spaced_suffix = list(accumulate((spaced for _, spaced in reversed(counts)), initial=0))[::-1]
+
+        def window_tokens(message_count: int) -> int:
+            # Tokens of the last message_count messages, joined as the base joins them
+            if message_count <= 0:
+                return initial_token_count
+            start = len(chat_history) - message_count
+            return counts[start][0] + spaced_suffix[start + 1] + initial_token_count
+
+        message_count = len(chat_history)
+        token_count = window_tokens(message_count)
+
+        while token_count > self.token_limit and message_count > 1:
+            message_count -= 1
+            while message_count > 1 and chat_history[-message_count].role in (
+                MessageRole.TOOL,
+                MessageRole.ASSISTANT,
+            ):
+                # History may not start with an assistant/tool message
+                message_count -= 1
+            token_count = window_tokens(message_count)
+
+        # A single message over the limit is still returned, so the LLM
+        # reports it as too long instead of getting no message at all
+        if token_count > self.token_limit or message_count <= 0:
+            return chat_history[-1:]
+
+        return chat_history[-message_count:]
+
+    def set(self, messages: List[ChatMessage]) -> None:
+        self._token_counts.clear()
+        super().set(messages)
+
+    def reset(self) -> None:
+        self._token_counts.clear()
+        super().reset()
@@ -1,53 +1,96 @@
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.security import HTTPBearer
+from fastapi import FastAPI, HTTPException, Depends, Query
 from uuid import UUID
-from typing import Optional
+from typing import Annotated, List, Optional
 from datetime import timedelta
+from decimal import Decimal
+import asyncio
+import orjson
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import StringConstraints
+from fastapi.concurrency import run_in_threadpool
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
 import os
 
 # Import services
 from services import AuthService, UserService, TenantProfileService, ReminderService, ConversationService, PropertyService, TenancyService
+from services import pg_reads
 from services.schema import (
     UsersInsert, UsersUpdate,
     TenantProfilesInsert, TenantProfilesUpdate,
     RemindersInsert,
     MessagesInsert, ConversationsInsert,
     PropertyPreferencesInsert, PropertyPreferencesUpdate,
+    PropertiesInsert,
     TenancyAgreementsInsert
 )
 
+# Finish building request-body validators at import (schema.py uses postponed
+# annotations), so the first request to each endpoint doesn't pay for it.
+for _schema in (
+    UsersInsert, UsersUpdate,
+    TenantProfilesInsert, TenantProfilesUpdate,
+    RemindersInsert,
+    MessagesInsert, ConversationsInsert,
+    PropertyPreferencesInsert, PropertyPreferencesUpdate,
+    PropertiesInsert,
+    TenancyAgreementsInsert,
+):
+    _schema.model_rebuild()
+
 # Import exceptions
 from services.exceptions import (
-    NotFoundError, ValidationError, AuthenticationError, OperationError
+    CasaAmigoError, NotFoundError, ValidationError, AuthenticationError, OperationError
 )
 
 from core.config.jwt_handler import create_access_token, get_current_user
+from core.config.supabase_client import SupabaseClient, SupabaseConnectionError
+from modules.pg_pool import create_pool
+from modules.supabase_instance import get_client
+from modules.etag import ETagMiddleware
+
+
+# Path/query ids: validated by pydantic-core's compiled pattern and passed on as
+# strings (services send them to Postgres as text anyway), no uuid.UUID objects
+UUIDStr = Annotated[
+    str,
+    StringConstraints(
+        pattern=r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+    ),
+]
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title="FAST APIs for Casa Amigo",
     description="Backend API for Casa Amigo rental assistant",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes dicts/lists (and UUIDs/datetimes) much faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
-# Get allowed origins from environment variable or use defaults
+# Exact origins, plus one regex (compiled once) for the Streamlit Cloud / Render subdomains
 ALLOWED_ORIGINS = [
-    "https://*.streamlit.app",
     "http://localhost:8501",
-    "https://*.onrender.com",  # Add this for Render!
-    "*"  # Or just use this for simplicity in a school project
 ]
+ALLOWED_ORIGIN_REGEX = r"^https://[a-z0-9-]+\.(streamlit\.app|onrender\.com)$"
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
+    allow_origin_regex=ALLOWED_ORIGIN_REGEX,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["authorization", "content-type", "if-none-match"],
+    expose_headers=["ETag"],
+    max_age=86400,  # browsers reuse a preflight for a day
 )
 
+# Lets clients revalidate unchanged GET responses with a bodiless 304
+app.add_middleware(ETagMiddleware)
+
 # Initialize services
 auth_service = AuthService()
 user_service = UserService()
@@ -57,23 +100,78 @@ conversation_service = ConversationService()
 property_service = PropertyService()
 tenancy_service = TenancyService()
 
-# Security
-security = HTTPBearer(auto_error=False)
-
-# ==================== HELPER FUNCTIONS ====================
-
-def _handle_service_error(e: Exception, status_code: int = 400):
-    """Convert service exceptions to HTTP exceptions"""
-    if isinstance(e, NotFoundError):
-        raise HTTPException(status_code=404, detail=str(e))
-    elif isinstance(e, AuthenticationError):
-        raise HTTPException(status_code=401, detail=str(e))
-    elif isinstance(e, ValidationError):
-        raise HTTPException(status_code=422, detail=str(e))
-    elif isinstance(e, OperationError):
-        raise HTTPException(status_code=500, detail=str(e))
+# ==================== RESPONSE CACHE ====================
+# GET responses are cached per route + params (including the caller), under one
+# namespace per resource; writes clear the namespaces whose reads they affect.
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_TTL_SECONDS = 60
+# Browse pages are requested identically by most users; creates invalidate them
+PROPERTIES_CACHE_TTL_SECONDS = 30
+
+
+@app.on_event("startup")
+async def init_response_cache():
+    """
+    Use Redis when REDIS_URL is set (shared across workers), else a per-process memory cache.
+    Run Redis with `maxmemory-policy allkeys-lru` so hot pages stay resident under memory pressure.
+    """
+    if REDIS_URL:
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+
+        FastAPICache.init(RedisBackend(aioredis.from_url(REDIS_URL)), prefix="casa")
     else:
-        raise HTTPException(status_code=status_code, detail=str(e))
+        FastAPICache.init(InMemoryBackend(), prefix="casa")
+
+
+# ==================== SUPABASE CLIENT ====================
+@app.on_event("startup")
+async def init_supabase_client():
+    """Create this worker's Supabase client after fork, off the import path."""
+    await run_in_threadpool(get_client)
+
+
+# ==================== DIRECT POSTGRES POOL ====================
+# Hot reads (user, reminders, messages) go straight to Postgres when DATABASE_URL
+# is set; otherwise everything uses the PostgREST services.
+@app.on_event("startup")
+async def init_pg_pool():
+    app.state.pg_pool = await create_pool()
+
+
+@app.on_event("shutdown")
+async def close_pg_pool():
+    if app.state.pg_pool is not None:
+        await app.state.pg_pool.close()
+
+
+def _page_key_builder(func, namespace: str = "", *, request=None, response=None, args=(), kwargs=None):
+    """Compact key for public paginated lists: just (limit, offset)."""
+    kwargs = kwargs or {}
+    return f"{namespace}:{kwargs.get('limit')}:{kwargs.get('offset')}"
+
+
+async def _invalidate(*namespaces: str):
+    for namespace in namespaces:
+        await FastAPICache.clear(namespace=namespace)
+
+# ==================== ERROR HANDLING ====================
+# Service exceptions -> HTTP status; routes just let them propagate.
+# Starlette picks the handler of the most specific class in the MRO.
+def _error_handler(status_code: int):
+    async def handler(request, exc: Exception):
+        return ORJSONResponse({"detail": str(exc)}, status_code=status_code)
+    return handler
+
+
+for _exc, _status in (
+    (NotFoundError, 404),
+    (AuthenticationError, 401),
+    (ValidationError, 422),
+    (OperationError, 500),
+    (CasaAmigoError, 400),
+):
+    app.add_exception_handler(_exc, _error_handler(_status))
 
 # ==================== HEALTH CHECK ====================
 @app.get("/", tags=["Health Check"])
@@ -81,6 +179,16 @@ async def root():
     """Simple endpoint for health checks."""
     return {"status": "ok", "service": "fastapi"}
 
+
+@app.get("/health/db", tags=["Health Check"])
+async def db_health():
+    """Check connectivity to Supabase (explicit, instead of probing at startup)."""
+    try:
+        await run_in_threadpool(SupabaseClient.get().healthcheck)
+    except SupabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "ok", "service": "supabase"}
+
 # ==================== FOR PINGS FROM GITHUB/UPTIMEROBOT ====================
 # This is to ensure clean logs for pings from uptime monitoring services
 @app.api_route("/", methods=["GET", "HEAD"])
@@ -90,123 +198,120 @@ async def root():
 @app.post("/auth/signup", tags=["Auth"])
 async def signup(email: str, name: str, password: str, user_type: str = "tenant"):
     """Create a new user account"""
-    try:
-        user = auth_service.signup(email, name, password, user_type)
-        return {"user_id": user.get("user_id"), "email": user.get("email_id"), "name": user.get("name"), "user_type": user.get("user_type")}
-    except Exception as e:
-        _handle_service_error(e)
+    user = await run_in_threadpool(auth_service.signup, email, name, password, user_type)
+    return {"user_id": user.get("user_id"), "email": user.get("email_id"), "name": user.get("name"), "user_type": user.get("user_type")}
 
 @app.post("/auth/login", tags=["Auth"])
 async def login(email: str, password: str):
     """Authenticate user and return user info"""
-    try:
-        user = auth_service.login(email, password)
-        access_token = create_access_token(
-            user_id=user.get("user_id"),
-            expires_delta=timedelta(minutes=30)
-        )
-        return {
-            "user_id": user.get("user_id"),
-            "email": user.get("email_id"),
-            "name": user.get("name"),
-            "user_type": user.get("user_type"),
-            "access_token": access_token
-        }
-    except Exception as e:
-        _handle_service_error(e, status_code=401)
+    user = await run_in_threadpool(auth_service.login, email, password)
+    access_token = create_access_token(
+        user_id=user.get("user_id"),
+        expires_delta=timedelta(minutes=30)
+    )
+    return {
+        "user_id": user.get("user_id"),
+        "email": user.get("email_id"),
+        "name": user.get("name"),
+        "user_type": user.get("user_type"),
+        "access_token": access_token
+    }
 
 
 # ==================== USER ROUTES ====================
 
 @app.get("/users/{user_id}", tags=["Users"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="users")
 async def get_user(
-    user_id: UUID, 
+    user_id: UUIDStr, 
     current_user: UUID = Depends(get_current_user)
 ):
     """Get user details by ID"""
-    try:
-        user = user_service.get_user(user_id)
-        return user
-    except Exception as e:
-        _handle_service_error(e)
+    if app.state.pg_pool is not None:
+        user = await pg_reads.get_user(app.state.pg_pool, user_id)
+    else:
+        user = await run_in_threadpool(user_service.get_user, user_id)
+    return user
 
 
 @app.post("/users", tags=["Users"])
 async def create_user(user: UsersInsert):
     """Create a new user"""
-    try:
-        created_user = user_service.create_user(user)
-        return created_user
-    except Exception as e:
-        _handle_service_error(e)
+    created_user = await run_in_threadpool(user_service.create_user, user)
+    await _invalidate("users")
+    return created_user
 
 
 @app.put("/users/{user_id}", tags=["Users"])
 async def update_user(
-    user_id: UUID, 
+    user_id: UUIDStr, 
     user: UsersUpdate, 
     current_user: UUID = Depends(get_current_user)
 ):
     """Update user details"""
-    try:
-        updated_user = user_service.update_user(user_id, user)
-        return updated_user
-    except Exception as e:
-        _handle_service_error(e)
+    updated_user = await run_in_threadpool(user_service.update_user, user_id, user)
+    await _invalidate("users", "tenantprofiles")
+    return updated_user
 
 
 # ==================== USER PROFILE ROUTES ====================
 
 @app.get("/tenantprofiles/{user_id}", tags=["Tenant Profiles"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="tenantprofiles")
 async def get_tenant_profile(
-    user_id: UUID, 
+    user_id: UUIDStr, 
     current_user: UUID = Depends(get_current_user)
 ):
     """Get user's tenant profile"""
-    try:
-        profile = tenant_profile_service.get_profile(user_id)
-        return profile
-    except Exception as e:
-        _handle_service_error(e)
+    profile = await run_in_threadpool(tenant_profile_service.get_profile, user_id)
+    return profile
+
+
+@app.get("/tenantprofiles/{user_id}/bundle", tags=["Tenant Profiles"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="tenantprofiles")
+async def get_tenant_bundle(
+    user_id: UUIDStr, 
+    current_user: UUID = Depends(get_current_user)
+):
+    """Get user's tenant profile and property preferences in one call"""
+    bundle = await run_in_threadpool(tenant_profile_service.get_tenant_bundle, user_id)
+    return bundle
 
 
 @app.post("/tenantprofiles", tags=["Tenant Profiles"])
 async def create_tenant_profile(profile: TenantProfilesInsert):
     """Create a new tenant profile"""
-    try:
-        created_profile = tenant_profile_service.create_profile(profile)
-        return created_profile
-    except Exception as e:
-        _handle_service_error(e)
+    created_profile = await run_in_threadpool(tenant_profile_service.create_profile, profile)
+    await _invalidate("tenantprofiles")
+    return created_profile
 
 
 @app.put("/tenantprofiles/{profile_id}", tags=["Tenant Profiles"])
 async def update_tenant_profile(
-    profile_id: UUID, 
+    profile_id: UUIDStr, 
     profile: TenantProfilesUpdate,
     current_user: UUID = Depends(get_current_user)
 ):
     """Update user's tenant profile"""
-    try:
-        updated_profile = tenant_profile_service.update_profile(profile_id, profile)
-        return updated_profile
-    except Exception as e:
-        _handle_service_error(e)
+    updated_profile = await run_in_threadpool(tenant_profile_service.update_profile, profile_id, profile)
+    await _invalidate("tenantprofiles")
+    return updated_profile
 
 
 # ==================== REMINDERS ROUTES ====================
 
 @app.get("/reminders/{user_id}", tags=["Reminders"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="reminders")
 async def list_reminders(
-    user_id: UUID, 
+    user_id: UUIDStr, 
     current_user: UUID = Depends(get_current_user)
 ):
     """List all reminders for a user"""
-    try:
-        reminders = reminder_service.list_reminders(user_id)
-        return {"reminders": reminders}
-    except Exception as e:
-        _handle_service_error(e)
+    if app.state.pg_pool is not None:
+        reminders = await pg_reads.list_reminders(app.state.pg_pool, user_id)
+    else:
+        reminders = await run_in_threadpool(reminder_service.list_reminders, user_id)
+    return {"reminders": reminders}
 
 
 @app.post("/reminders", tags=["Reminders"])
@@ -215,65 +320,104 @@ async def create_reminder(
     current_user: UUID = Depends(get_current_user)
 ):
     """Create a new reminder"""
-    try:
-        created_reminder = reminder_service.create_reminder(reminder)
-        return created_reminder
-    except Exception as e:
-        _handle_service_error(e)
+    created_reminder = await run_in_threadpool(reminder_service.create_reminder, reminder)
+    await _invalidate("reminders", "dashboard")
+    return created_reminder
 
 
 @app.post("/reminders/{reminder_id}/send", tags=["Reminders"])
 async def send_reminder(
-    reminder_id: UUID, 
-    user_id: UUID, 
+    reminder_id: UUIDStr, 
+    user_id: UUIDStr, 
     current_user: UUID = Depends(get_current_user)
 ):
     """Send/trigger a reminder (for agentic pipeline)"""
-    try:
-        notification = reminder_service.send_reminder(reminder_id, user_id)
-        return {"status": "sent", "notification": notification}
-    except Exception as e:
-        _handle_service_error(e)
+    notification = await run_in_threadpool(reminder_service.send_reminder, reminder_id, user_id)
+    await _invalidate("reminders", "dashboard")
+    return {"status": "sent", "notification": notification}
 
 
 # ==================== CONVERSATIONS ROUTES ====================
 
 @app.get("/conversations/{user_id}", tags=["Conversations"])
-async def list_conversations(user_id: UUID, current_user: UUID = Depends(get_current_user)):
+@cache(expire=CACHE_TTL_SECONDS, namespace="conversations")
+async def list_conversations(user_id: UUIDStr, current_user: UUID = Depends(get_current_user)):
     """List all conversations for a user"""
-    try:
-        conversations = conversation_service.list_conversations(user_id)
-        return {"conversations": conversations}
-    except Exception as e:
-        _handle_service_error(e)
+    conversations = await run_in_threadpool(conversation_service.list_conversations, user_id)
+    return {"conversations": conversations}
+
+
+@app.get("/conversations/{user_id}/latest", tags=["Conversations"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="conversations")
+async def get_latest_conversation(
+    user_id: UUIDStr,
+    limit: int = 50,
+    current_user: UUID = Depends(get_current_user)
+):
+    """Get the user's most recent conversation with its latest `limit` messages"""
+    latest = await run_in_threadpool(conversation_service.get_latest_conversation, user_id, limit)
+    return latest
 
 
 @app.post("/conversations/{conversation_id}/messages", tags=["Conversations"])
 async def add_message_to_conversation(
-    conversation_id: UUID, 
+    conversation_id: UUIDStr, 
     message: MessagesInsert,
     current_user: UUID = Depends(get_current_user)
 ):
     """Add a message to conversation history"""
-    try:
-        added_message = conversation_service.add_message(conversation_id, message)
-        return added_message
-    except Exception as e:
-        _handle_service_error(e)
+    added_message = await run_in_threadpool(conversation_service.add_message, conversation_id, message)
+    await _invalidate("conversations", "dashboard")
+    return added_message
 
 
+@app.post("/conversations/{conversation_id}/messages/batch", tags=["Conversations"])
+async def add_messages_to_conversation(
+    conversation_id: UUIDStr,
+    messages: List[MessagesInsert],
+    current_user: UUID = Depends(get_current_user)
+):
+    """Add several messages (e.g. a user/assistant turn) to conversation history in one insert"""
+    added_messages = await run_in_threadpool(conversation_service.add_messages, conversation_id, messages)
+    await _invalidate("conversations", "dashboard")
+    return {"messages": added_messages}
+
+
+MAX_MESSAGES_LIMIT = 500
+
+
+def _orjson_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+async def _stream_json_list(key: str, rows):
+    """Serialize {key: [rows...]} incrementally, one row per chunk."""
+    yield b'{"' + key.encode() + b'":['
+    first = True
+    async for row in rows:
+        yield (b"" if first else b",") + orjson.dumps(row, default=_orjson_default)
+        first = False
+    yield b"]}"
+
+
+# Not response-cached: the direct-Postgres path streams. The chat UI restores
+# history through the cached /conversations/{user_id}/latest instead.
 @app.get("/conversations/{conversation_id}/messages", tags=["Conversations"])
 async def get_conversation_messages(
-    conversation_id: UUID, 
-    limit: int = 50,
+    conversation_id: UUIDStr, 
+    limit: int = Query(50, ge=1, le=MAX_MESSAGES_LIMIT),
+    recent: bool = False,
     current_user: UUID = Depends(get_current_user)
 ):
-    """Get all messages from a conversation"""
-    try:
-        messages = conversation_service.get_messages(conversation_id, limit)
-        return {"messages": messages}
-    except Exception as e:
-        _handle_service_error(e)
+    """Get messages from a conversation (the latest `limit` ones when `recent` is set)"""
+    if app.state.pg_pool is not None:
+        # Query errors raise OperationError here (-> 500), before the 200 is sent
+        rows = await pg_reads.iter_messages(app.state.pg_pool, conversation_id, limit, recent=recent)
+        return StreamingResponse(_stream_json_list("messages", rows), media_type="application/json")
+    messages = await run_in_threadpool(conversation_service.get_messages, conversation_id, limit, recent=recent)
+    return {"messages": messages}
 
 @app.post("/conversations", tags=["Conversations"])
 async def create_conversation(
@@ -281,25 +425,48 @@ async def create_conversation(
     current_user: UUID = Depends(get_current_user)
 ):
     """Create a new conversation"""
+    created_conversation = await run_in_threadpool(conversation_service.create_conversation, conversation)
+    await _invalidate("conversations", "dashboard")
+    return created_conversation
+
+# ==================== DASHBOARD ROUTES ====================
+
+DASHBOARD_CACHE_TTL_SECONDS = 15
+
+
+async def _preferences_or_none(user_id: UUIDStr):
     try:
-        created_conversation = conversation_service.create_conversation(conversation)
-        return created_conversation
-    except Exception as e:
-        _handle_service_error(e)
+        return await run_in_threadpool(property_service.get_preferences, user_id)
+    except NotFoundError:
+        return None
+
+
+@app.get("/dashboard/{user_id}", tags=["Dashboard"])
+@cache(expire=DASHBOARD_CACHE_TTL_SECONDS, namespace="dashboard")
+async def get_dashboard(
+    user_id: UUIDStr,
+    current_user: UUID = Depends(get_current_user)
+):
+    """Reminders, conversations and preferences for a user, fetched concurrently in one call"""
+    reminders, conversations, preferences = await asyncio.gather(
+        run_in_threadpool(reminder_service.list_reminders, user_id),
+        run_in_threadpool(conversation_service.list_conversations, user_id),
+        _preferences_or_none(user_id),
+    )
+    return {"reminders": reminders, "conversations": conversations, "preferences": preferences}
+
 
 # ==================== PROPERTY PREFERENCES ROUTES ====================
 
 @app.get("/preferences/{user_id}", tags=["Property Preferences"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="preferences")
 async def get_property_preferences(
-    user_id: UUID, 
+    user_id: UUIDStr, 
     current_user: UUID = Depends(get_current_user)
 ):
     """Get user's property preferences"""
-    try:
-        preferences = property_service.get_preferences(user_id)
-        return preferences
-    except Exception as e:
-        _handle_service_error(e)
+    preferences = await run_in_threadpool(property_service.get_preferences, user_id)
+    return preferences
 
 
 @app.post("/preferences", tags=["Property Preferences"])
@@ -308,94 +475,82 @@ async def create_property_preferences(
     current_user: UUID = Depends(get_current_user)
 ):
     """Create user's property preferences"""
-    try:
-        created_preferences = property_service.create_preferences(preferences)
-        return created_preferences
-    except Exception as e:
-        _handle_service_error(e)
+    created_preferences = await run_in_threadpool(property_service.create_preferences, preferences)
+    await _invalidate("preferences", "tenantprofiles", "dashboard")
+    return created_preferences
 
 
 @app.put("/preferences/{preference_id}", tags=["Property Preferences"])
 async def update_property_preferences(
-    preference_id: UUID, 
+    preference_id: UUIDStr, 
     preferences: PropertyPreferencesUpdate,
     current_user: UUID = Depends(get_current_user)
 ):
     """Update user's property preferences"""
-    try:
-        updated_preferences = property_service.update_preferences(preference_id, preferences)
-        return updated_preferences
-    except Exception as e:
-        _handle_service_error(e)
+    updated_preferences = await run_in_threadpool(property_service.update_preferences, preference_id, preferences)
+    await _invalidate("preferences", "tenantprofiles", "dashboard")
+    return updated_preferences
 
 
 # ==================== PROPERTY ROUTES ====================
 
 @app.get("/properties", tags=["Properties"])
+@cache(expire=PROPERTIES_CACHE_TTL_SECONDS, namespace="properties", key_builder=_page_key_builder)
 async def get_properties(limit: int = 20, offset: int = 0):
     """Get properties with pagination"""
-    try:
-        properties = property_service.get_properties(limit, offset)
-        return {"properties": properties, "count": len(properties)}
-    except Exception as e:
-        _handle_service_error(e)
+    properties = await run_in_threadpool(property_service.get_properties, limit, offset)
+    return {"properties": properties, "count": len(properties)}
 
 
 @app.post("/properties/search", tags=["Properties"])
 async def search_properties_by_preferences(
-    user_id: UUID, 
+    user_id: UUIDStr, 
     current_user: UUID = Depends(get_current_user)
 ):
     """Search properties matching user's preferences"""
-    try:
-        matching_properties = property_service.search_by_preferences(user_id)
-        return {"properties": matching_properties, "count": len(matching_properties)}
-    except Exception as e:
-        _handle_service_error(e)
+    matching_properties = await run_in_threadpool(property_service.search_by_preferences, user_id)
+    return {"properties": matching_properties, "count": len(matching_properties)}
 
 @app.post("/properties", tags=["Properties"])
-async def create_property(property_data: dict):
+async def create_property(property_data: PropertiesInsert):
     """Create a new property"""
-    try:
-        property_obj = property_service.create_property(property_data)
-        return property_obj
-    except Exception as e:
-        _handle_service_error(e)
+    property_obj = await run_in_threadpool(property_service.create_property, property_data)
+    await _invalidate("properties")
+    return property_obj
 
 
 # ==================== TENANCY AGREEMENT ROUTES ====================
 
 @app.get("/tenancy-agreements", tags=["Tenancy Agreements"])
+@cache(expire=CACHE_TTL_SECONDS, namespace="tenancy")
 async def list_tenancy_agreements(
     limit: int = 50,
     offset: int = 0,
 ):
     """List tenancy agreements (for Agent dashboard)."""
-    try:
-        agreements = tenancy_service.list_agreements(limit=limit, offset=offset)
-        return {"agreements": agreements}
-    except Exception as e:
-        _handle_service_error(e)
+    agreements = await run_in_threadpool(tenancy_service.list_agreements, limit=limit, offset=offset)
+    return {"agreements": agreements}
 
 
 @app.get("/tenancy-agreements/{agreement_id}", tags=["Tenancy Agreements"])
-async def get_tenancy_agreement(agreement_id: UUID):
+@cache(expire=CACHE_TTL_SECONDS, namespace="tenancy")
+async def get_tenancy_agreement(agreement_id: UUIDStr):
     """Get a specific tenancy agreement"""
-    try:
-        agreement = tenancy_service.get_agreement(agreement_id)
-        return agreement
-    except Exception as e:
-        _handle_service_error(e)
+    agreement = await run_in_threadpool(tenancy_service.get_agreement, agreement_id)
+    return agreement
 
 
 @app.post("/tenancy-agreements", tags=["Tenancy Agreements"])
 async def create_tenancy_agreement(agreement: TenancyAgreementsInsert):
     """Create a new tenancy agreement"""
-    try:
-        created_agreement = tenancy_service.create_agreement(agreement)
-        return created_agreement
-    except Exception as e:
-        _handle_service_error(e)
+    created_agreement = await run_in_threadpool(tenancy_service.create_agreement, agreement)
+    await _invalidate("tenancy")
+    return created_agreement
+
+
+# ==================== OPENAPI ====================
+# Routes are all declared; build the schema once now instead of on the first /docs hit
+app.openapi_schema = app.openapi()
 
 
 # ==================== RUN SERVER ====================
@@ -404,4 +559,13 @@ if __name__ == "__main__":
     import uvicorn
     import os
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    # uvloop + httptools (both from uvicorn[standard]) are the C event loop / HTTP parser;
+    # "auto" picks them when installed. Per-request access logs only when asked for.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        loop="auto",
+        http="auto",
+        access_log=os.getenv("ACCESS_LOG") == "1",
+    )
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""ETag / If-None-Match support for GET responses (pure ASGI middleware)."""
+
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (t.strip().removeprefix("W/") for t in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def _private_cache_control(cache_control: str | None) -> str:
+    """Cache-Control for an authenticated response: never storable by shared caches."""
+    directives = [d.strip() for d in (cache_control or "").split(",") if d.strip()]
+    directives = [d for d in directives if d.lower() not in ("public", "private")]
+    return ", ".join(["private", *directives])
+
+
+class ETagMiddleware:
+    """
+    Tags successful GET responses with a content hash and answers
+    304 Not Modified when the client's If-None-Match already matches.
+
+    The hash replaces any ETag the route set: fastapi-cache's is built with
+    Python's per-process randomized hash(), so it differs between workers.
+    Responses to authenticated requests are marked Cache-Control: private.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        authenticated = "authorization" in request_headers
+        start = None
+        chunks = []
+
+        async def send_with_etag(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if authenticated:
+                    headers = MutableHeaders(scope=message)
+                    headers["Cache-Control"] = _private_cache_control(headers.get("cache-control"))
+                if "content-length" not in Headers(raw=message["headers"]):
+                    # Streaming response: pass through (no ETag) instead of buffering it
+                    start = False
+                    await send(message)
+                    return
+                start = message
+                return
+            if start is False:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start)
+            if start["status"] == 200:
+                etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                headers["ETag"] = etag
+                if if_none_match and _etag_matches(if_none_match, etag):
+                    start["status"] = 304
+                    del headers["content-length"]
+                    body = b""
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
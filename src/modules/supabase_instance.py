@@ -1,17 +1,15 @@
 from core.config.supabase_client import SupabaseClient, SupabaseCredentialsError, SupabaseConnectionError
 
-class SingletonSupabaseClient:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            try:
-                cls._instance = SupabaseClient().client
-            except SupabaseCredentialsError as e:
-                raise RuntimeError(f"Supabase credentials missing: {e}")
-            except SupabaseConnectionError as e:
-                raise RuntimeError(f"Unable to connect to Supabase: {e}")
-        return cls._instance
 
-# Initialize once at module load
-supabase_client = SingletonSupabaseClient()
\ No newline at end of file
+def get_client():
+    """
+    Return the shared Supabase client, creating it on first use (not at import,
+    so forked workers each build their own after startup).
+    SupabaseClient.get() is the lock-guarded process-wide singleton.
+    """
+    try:
+        return SupabaseClient.get().client
+    except SupabaseCredentialsError as e:
+        raise RuntimeError(f"Supabase credentials missing: {e}")
+    except SupabaseConnectionError as e:
+        raise RuntimeError(f"Unable to connect to Supabase: {e}")
@@ -1,19 +1,120 @@
 import os
 import time
+from collections import Counter, deque
+from types import MappingProxyType
 from typing import List, Dict, Any, Optional
 
+import pandas as pd
 import streamlit as st
-from dotenv import load_dotenv
-from config import ConfigManager
+from config import ConfigManager, ensure_dotenv
 from core import ChatbotEngine, DocumentIndexManager
 
 
 # -------------------------
-# Utilities (dev helpers)
+# Mock data (read-only, shared by all sessions)
 # -------------------------
-def init_session_key(key: str, default_val):
-    if key not in st.session_state:
-        st.session_state[key] = default_val
+_AGENT_CONV_SEED = (
+    MappingProxyType({
+        "id": "conv-001",
+        "tenant_email": "alice@example.com",
+        "last_message": "What’s the standard deposit for a 1BR near Tiong Bahru?",
+        "updated_at": "2025-10-15 14:21",
+        "status": "open"
+    }),
+    MappingProxyType({
+        "id": "conv-002",
+        "tenant_email": "ben@nus.edu.sg",
+        "last_message": "Could we schedule a viewing for Saturday 11am?",
+        "updated_at": "2025-10-16 09:10",
+        "status": "open"
+    }),
+    MappingProxyType({
+        "id": "conv-003",
+        "tenant_email": "charlie@gmail.com",
+        "last_message": "Any 2BR options under 4k at Queenstown?",
+        "updated_at": "2025-10-17 18:47",
+        "status": "pending"
+    }),
+)
+
+_MOCK_LISTINGS = (
+    MappingProxyType({
+        "name": "SkyVue Residences, Bishan",
+        "price": "$3,800 / mo",
+        "bedrooms": "2BR",
+        "distance": "6 min walk to Bishan MRT",
+        "relevance_pct": 95,
+        "relevance": "95%",
+    }),
+    MappingProxyType({
+        "name": "Commonwealth Towers",
+        "price": "$4,200 / mo",
+        "bedrooms": "2BR",
+        "distance": "3 min walk to Queenstown MRT",
+        "relevance_pct": 91,
+        "relevance": "91%",
+    }),
+    MappingProxyType({
+        "name": "The Anchorage, Redhill",
+        "price": "$3,600 / mo",
+        "bedrooms": "1BR",
+        "distance": "8 min walk to Redhill MRT",
+        "relevance_pct": 87,
+        "relevance": "87%",
+    }),
+)
+
+
+# Chat messages kept in session state; older ones fall off the front
+CHAT_HISTORY_MAXLEN = 200
+
+
+def new_chat_history(greeting: str) -> deque:
+    """Bounded tenant chat history, starting with an assistant greeting."""
+    return deque([{"role": "assistant", "content": greeting}], maxlen=CHAT_HISTORY_MAXLEN)
+
+
+# -------------------------
+# Session defaults
+# -------------------------
+# Filled into st.session_state in one pass, only for missing keys. Callables
+# are factories, called only when the key is missing, so mutable values
+# (lists/dicts) are built fresh for each session instead of shared.
+_SESSION_DEFAULTS: Dict[str, Any] = {
+    # Auth-ish state (dev simulation)
+    "user_email": "",
+    "role": "tenant",  # "tenant" | "agent"
+
+    # Routing state (per-role)
+    "tenant_page": "Home",  # "Home" | "Chat" | "Profile"
+    "agent_page": "Dashboard",  # "Dashboard" | "Conversations"
+
+    # Chat state (tenant chat)
+    "messages": lambda: new_chat_history("Hello 👋! Ask me anything about your rental agreements."),
+    "current_conversation_id": "demo-conv-001",  # placeholder
+
+    # Mock data for Agent view (read-only)
+    "agent_conversations": lambda: [dict(c) for c in _AGENT_CONV_SEED],
+    # id -> conversation index over the list above (built once; the agent view is read-only)
+    "agent_conversations_by_id": lambda: {c["id"]: c for c in st.session_state["agent_conversations"]},
+    "agent_selected_conversation": "conv-001",
+}
+
+
+@st.cache_resource
+def get_config_manager() -> ConfigManager:
+    return ConfigManager()
+
+
+@st.cache_resource
+def get_doc_manager() -> DocumentIndexManager:
+    return DocumentIndexManager()
+
+
+@st.cache_resource
+def get_chatbot(_index, api_key: str, index_version: str = "") -> ChatbotEngine:
+    # Shared LLM + index; per-session memory lives in st.session_state
+    return ChatbotEngine(_index, api_key, index_version)
 
 
 # -------------------------
@@ -23,9 +124,11 @@ class StreamlitApp:
     """Casa Amigo – role-based single-file app (Tenant-first, light Agent view)"""
 
     def __init__(self):
-        self.config_manager = ConfigManager()
-        self.doc_manager = DocumentIndexManager()
-        self.chatbot = ChatbotEngine(self.doc_manager.index, self.config_manager.api_key)
+        self.config_manager = get_config_manager()
+        self.doc_manager = get_doc_manager()
+        self.chatbot = get_chatbot(
+            self.doc_manager.index, self.config_manager.api_key, self.doc_manager.index_version
+        )
 
         self._setup_page()
         self._init_session_state()
@@ -39,45 +142,10 @@ class StreamlitApp:
         st.title("🏠 Casa Amigo - Rental Assistant")
 
     def _init_session_state(self):
-        # Auth-ish state (dev simulation)
-        init_session_key("user_email", "")
-        init_session_key("role", "tenant")  # "tenant" | "agent"
-
-        # Routing state (per-role)
-        init_session_key("tenant_page", "Home")  # "Home" | "Chat" | "Profile"
-        init_session_key("agent_page", "Dashboard")  # "Dashboard" | "Conversations"
-
-        # Chat state (tenant chat)
-        init_session_key("messages", [
-            {"role": "assistant", "content": "Hello 👋! Ask me anything about your rental agreements."}
-        ])
-        init_session_key("current_conversation_id", "demo-conv-001")  # placeholder
-
-        # Mock data for Agent view (read-only)
-        init_session_key("agent_conversations", [
-            {
-                "id": "conv-001",
-                "tenant_email": "alice@example.com",
-                "last_message": "What’s the standard deposit for a 1BR near Tiong Bahru?",
-                "updated_at": "2025-10-15 14:21",
-                "status": "open"
-            },
-            {
-                "id": "conv-002",
-                "tenant_email": "ben@nus.edu.sg",
-                "last_message": "Could we schedule a viewing for Saturday 11am?",
-                "updated_at": "2025-10-16 09:10",
-                "status": "open"
-            },
-            {
-                "id": "conv-003",
-                "tenant_email": "charlie@gmail.com",
-                "last_message": "Any 2BR options under 4k at Queenstown?",
-                "updated_at": "2025-10-17 18:47",
-                "status": "pending"
-            },
-        ])
-        init_session_key("agent_selected_conversation", "conv-001")
+        state = st.session_state
+        for key, default in _SESSION_DEFAULTS.items():
+            if key not in state:
+                state[key] = default() if callable(default) else default
 
     # -------------------------
     # Sidebar (role + navigation)
@@ -108,9 +176,7 @@ class StreamlitApp:
 
             with st.expander("⚙️ Settings"):
                 if st.button("Clear tenant chat history"):
-                    st.session_state["messages"] = [
-                        {"role": "assistant", "content": "Chat cleared. How can I help you now? 🙂"}
-                    ]
+                    st.session_state["messages"] = new_chat_history("Chat cleared. How can I help you now? 🙂")
                     st.toast("Cleared chat history.")
 
     # -------------------------
@@ -172,6 +238,9 @@ class StreamlitApp:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
 
+    # Fragment: chat input and footer buttons rerun only this function,
+    # not the sidebar/router around it
+    @st.fragment
     def _tenant_chat(self):
         st.subheader("💬 Tenant Chat")
         self._display_chat_history()
@@ -183,19 +252,39 @@ class StreamlitApp:
             with st.chat_message("user"):
                 st.markdown(user_input)
 
-            # assistant response with typing indicator
+            # assistant response, streamed as tokens arrive. Completed paragraphs
+            # are rendered once into their own element; only the trailing
+            # (still growing) paragraph is re-rendered, so each redraw stays small.
             with st.chat_message("assistant"):
-                thinking = st.empty()
-                thinking.write("_Assistant is typing…_")
+                tail_slot = st.empty()
+                tail_slot.write("_Assistant is typing…_")
+                response, tail = "", ""
                 try:
-                    # Simulate brief latency; remove or reduce if undesirable
-                    time.sleep(0.2)
-                    response = self.chatbot.ask(user_input)
+                    last_render = 0.0
+                    for token in self.chatbot.stream_response(user_input):
+                        response += token
+                        tail += token
+                        while "\n\n" in tail:
+                            block, tail = tail.split("\n\n", 1)
+                            tail_slot.markdown(block)
+                            tail_slot = st.empty()
+                        # Throttle redraws to ~10/s; every token would be wasteful
+                        now = time.monotonic()
+                        if now - last_render >= 0.1:
+                            tail_slot.markdown(tail + "▌")
+                            last_render = now
                 except Exception as e:
-                    response = "⚠️ Sorry, something went wrong. Please try again."
-                    st.toast("Backend error (mock): {}".format(str(e)))
-                thinking.empty()
-                st.markdown(response)
+                    if response:
+                        # Stream broke mid-reply: keep what already arrived
+                        st.toast("Backend error (mock): {}".format(str(e)))
+                    else:
+                        # Streaming failed before the first token: retry without it
+                        try:
+                            response = tail = self.chatbot.get_response(user_input)
+                        except Exception as e:
+                            response = tail = "⚠️ Sorry, something went wrong. Please try again."
+                            st.toast("Backend error (mock): {}".format(str(e)))
+                tail_slot.markdown(tail)
 
             st.session_state["messages"].append({"role": "assistant", "content": response})
 
@@ -204,10 +293,9 @@ class StreamlitApp:
         cols = st.columns(3)
         with cols[0]:
             if st.button("🧹 Clear chat"):
-                st.session_state["messages"] = [
-                    {"role": "assistant", "content": "Chat cleared. How can I help you now? 🙂"}
-                ]
-                st.rerun()
+                st.session_state["messages"] = new_chat_history("Chat cleared. How can I help you now? 🙂")
+                self.chatbot.reset_session()
+                st.rerun(scope="fragment")
         with cols[1]:
             st.caption(f"Conversation ID: `{st.session_state['current_conversation_id']}` (mock)")
         with cols[2]:
@@ -237,8 +325,10 @@ class StreamlitApp:
         st.caption("Read-only preview to validate the end-to-end flow.")
 
         convs = st.session_state["agent_conversations"]
-        open_count = sum(1 for c in convs if c["status"] == "open")
-        pending_count = sum(1 for c in convs if c["status"] == "pending")
+        # One pass over the conversations for all status counts
+        status_counts = Counter(c["status"] for c in convs)
+        open_count = status_counts["open"]
+        pending_count = status_counts["pending"]
 
         k1, k2, k3 = st.columns(3)
         k1.metric("Open Conversations", open_count)
@@ -247,62 +337,58 @@ class StreamlitApp:
 
         st.markdown("### 🏘️ Recommended Listings (mock)")
 
-        listings = [
-            {
-                "name": "SkyVue Residences, Bishan",
-                "price": "$3,800 / mo",
-                "bedrooms": "2BR",
-                "distance": "6 min walk to Bishan MRT",
-                "relevance": "95%",
-            },
-            {
-                "name": "Commonwealth Towers",
-                "price": "$4,200 / mo",
-                "bedrooms": "2BR",
-                "distance": "3 min walk to Queenstown MRT",
-                "relevance": "91%",
-            },
-            {
-                "name": "The Anchorage, Redhill",
-                "price": "$3,600 / mo",
-                "bedrooms": "1BR",
-                "distance": "8 min walk to Redhill MRT",
-                "relevance": "87%",
-            },
-        ]
-
-        for prop in listings:
+        for prop in _MOCK_LISTINGS:
             with st.container(border=True):
                 st.write(f"**{prop['name']}** — {prop['price']}")
                 st.caption(f"{prop['bedrooms']} • {prop['distance']}")
-                st.progress(int(prop['relevance'].replace('%','')))
+                st.progress(prop["relevance_pct"], text=f"Relevance {prop['relevance']}")
 
         st.markdown("### Recent conversations")
-        for c in convs:
-            with st.container(border=True):
-                st.write(f"**{c['tenant_email']}** • `{c['id']}` • Updated: {c['updated_at']} • Status: **{c['status']}**")
-                st.write(f"_“{c['last_message']}”_")
-                if st.button("Open", key=f"open_{c['id']}", use_container_width=True):
-                    st.session_state["agent_selected_conversation"] = c["id"]
-                    st.session_state["agent_page"] = "Conversations"
-                    st.rerun()
+        st.caption("Select a row to open the conversation.")
+        selected = self._conversation_table(
+            convs, ["tenant_email", "id", "updated_at", "status", "last_message"], key="dashboard_conversations"
+        )
+        if selected:
+            st.session_state["agent_selected_conversation"] = selected
+            st.session_state["agent_page"] = "Conversations"
+            # Page change: full-app rerun so the router picks the new page
+            st.rerun(scope="app")
 
         st.info("Later: wire this to `conversations` (agent_id), add filters & pagination.")
 
+    def _conversation_table(self, convs: List[Dict[str, Any]], columns: List[str], key: str) -> Optional[str]:
+        """
+        Conversations as one selectable table (a single widget, however many
+        rows). Returns the id of the selected row, if any.
+        """
+        df = pd.DataFrame(convs, columns=columns)
+        event = st.dataframe(
+            df,
+            key=key,
+            on_select="rerun",
+            selection_mode="single-row",
+            hide_index=True,
+            use_container_width=True,
+        )
+        rows = event.selection.rows
+        return df["id"].iloc[rows[0]] if rows else None
+
+    # Fragment: inbox selection reruns only this view
+    @st.fragment
     def _agent_conversations(self):
         st.subheader("💼 Conversations (read-only)")
-        convs = {c["id"]: c for c in st.session_state["agent_conversations"]}
-        current = convs.get(st.session_state["agent_selected_conversation"])
+        inbox = st.session_state["agent_conversations"]
 
         cols = st.columns([1, 2])
         with cols[0]:
             st.markdown("#### Inbox")
-            for c in st.session_state["agent_conversations"]:
-                label = f"{c['tenant_email']} • {c['id']} • {c['status']}"
-                if st.button(label, key=f"select_{c['id']}", use_container_width=True):
-                    st.session_state["agent_selected_conversation"] = c["id"]
-                    st.rerun()
+            selected = self._conversation_table(
+                inbox, ["tenant_email", "id", "status", "updated_at"], key="inbox_conversations"
+            )
+            if selected:
+                st.session_state["agent_selected_conversation"] = selected
 
+        current = st.session_state["agent_conversations_by_id"].get(st.session_state["agent_selected_conversation"])
         with cols[1]:
             st.markdown("#### Conversation")
             if not current:
@@ -331,6 +417,6 @@ class StreamlitApp:
 # Entry
 
 if __name__ == "__main__":
-    load_dotenv()
+    ensure_dotenv()
     app = StreamlitApp()
     app.run()
@@ -1,13 +1,17 @@
 """Services and external integrations module."""
 
-from .auth import AuthService
-from .user import UserService
-from .tenant_profile import TenantProfileService
-from .property_service import PropertyService
-from .reminders import ReminderService
-from .conversation import ConversationService
-from .tenancy import TenancyService
-from . import schema
+# Service modules are imported on first attribute access, so a caller that
+# needs one service (or just services.pg_reads) doesn't import all of them.
+_LAZY_EXPORTS = {
+    "AuthService": ".auth",
+    "UserService": ".user",
+    "TenantProfileService": ".tenant_profile",
+    "PropertyService": ".property_service",
+    "ReminderService": ".reminders",
+    "ConversationService": ".conversation",
+    "TenancyService": ".tenancy",
+}
+_LAZY_SUBMODULES = {"schema"}
 
 __all__ = [
     "AuthService",
@@ -18,4 +22,16 @@ __all__ = [
     "ConversationService",
     "TenancyService",
     "schema"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    import importlib
+    if name in _LAZY_EXPORTS:
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
@@ -2,9 +2,18 @@ from .schema import UsersInsert
 from services.exceptions import AuthenticationError, ValidationError
 from typing import Dict
 import hashlib
+import hmac
 import secrets
 from .user import UserService
 
+# scrypt cost parameters for new hashes (stored with each hash, so they can be
+# raised later without breaking existing ones)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+
+
 class AuthService:
     """Authentication and authorization"""
     
@@ -13,18 +22,32 @@ class AuthService:
     
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password with salt"""
+        """Hash password with salt, as scrypt$n$r$p$salt$hash"""
         salt = secrets.token_hex(16)
-        hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-        return f"{salt}${hashed.hex()}"
+        hashed = hashlib.scrypt(
+            password.encode(), salt=bytes.fromhex(salt),
+            n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=SCRYPT_DKLEN,
+        )
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt}${hashed.hex()}"
     
     @staticmethod
     def verify_password(password: str, hash_str: str) -> bool:
-        """Verify password against hash"""
+        """Verify password against hash (scrypt, or legacy pbkdf2 salt$hash)"""
         try:
-            salt, hashed = hash_str.split('$')
+            parts = hash_str.split('$')
+            if parts[0] == "scrypt":
+                _, n, r, p, salt, hashed = parts
+                expected = bytes.fromhex(hashed)
+                new_hash = hashlib.scrypt(
+                    password.encode(), salt=bytes.fromhex(salt),
+                    n=int(n), r=int(r), p=int(p), dklen=len(expected),
+                )
+                return hmac.compare_digest(new_hash, expected)
+
+            # Accounts created before the switch to scrypt
+            salt, hashed = parts
             new_hash = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-            return new_hash.hex() == hashed
+            return hmac.compare_digest(new_hash.hex(), hashed)
         except (ValueError, AttributeError):
             return False
 
@@ -45,7 +68,10 @@ class AuthService:
     
     def login(self, email: str, password: str) -> Dict:
         """Authenticate user. Raises AuthenticationError on failure."""
-        user = self.user_service.get_user_by_email(email)
+        # Just what login needs: the returned profile fields plus the hash to check
+        user = self.user_service.get_user_by_email(
+            email, columns="user_id, email_id, name, user_type, password_hash"
+        )
         if not user:
             raise AuthenticationError("Invalid credentials")
         
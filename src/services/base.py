@@ -1,12 +1,14 @@
 from services.exceptions import OperationError, NotFoundError
-from modules.supabase_instance import supabase_client
+from modules.supabase_instance import get_client
 from typing import List, Dict, Any, Optional
         
 class BaseService:
     """Base service with error handling"""
     
-    def __init__(self):
-        self.client = supabase_client
+    @property
+    def client(self):
+        # Resolved lazily so importing/instantiating services opens no connections
+        return get_client()
 
     def _execute_query(self, query_fn, error_context: str = "Database operation"):
         """Execute query with consistent error handling"""
@@ -1,50 +1,104 @@
 from services.base import BaseService
 from services.schema import MessagesInsert, ConversationsInsert
 from uuid import UUID
-from typing import List, Dict
+from typing import List, Dict, Union
+from datetime import datetime, timedelta, timezone
+
+# Routes pass ids as validated strings already; UUID objects are accepted too
+IdLike = Union[UUID, str]
+
+
+def _id_str(value: IdLike) -> str:
+    """String form of an id, without re-formatting one that already is a string"""
+    return value if isinstance(value, str) else str(value)
+
+
+# Columns the DB generates (UUID, timestamps); left out of inserts when dumping
+MESSAGE_DB_GENERATED = {"message_id", "created_at"}
+CONVERSATION_DB_GENERATED = {"conversation_id", "created_at", "updated_at"}
 
 class ConversationService(BaseService):
     """Conversation and message management"""
     
-    def list_conversations(self, user_id: UUID) -> List[Dict]:
+    def list_conversations(self, user_id: IdLike) -> List[Dict]:
         """List all conversations for user"""
         return self._get_multiple(
             lambda: self.client.table("conversations")
                 .select("*")
-                .eq("user_id", str(user_id)),
+                .eq("user_id", _id_str(user_id)),
             f"List conversations for user {user_id}"
         )
     
-    def add_message(self, conversation_id: UUID, message: MessagesInsert) -> Dict:
+    def get_latest_conversation(self, user_id: IdLike, limit: int = 50) -> Dict:
+        """Most recent conversation for user with its latest `limit` messages (oldest first), in one query."""
+        rows = self._get_multiple(
+            lambda: self.client.table("conversations")
+                .select("*, messages(*)")
+                .eq("user_id", _id_str(user_id))
+                # created_at, not updated_at: it is never NULL (DESC puts NULLs
+                # first, and older postgrest clients drop nullsfirst=False), and
+                # conversation rows are never updated after creation anyway
+                .order("created_at", desc=True)
+                .limit(1)
+                .order("created_at", desc=True, foreign_table="messages")
+                .limit(limit, foreign_table="messages"),
+            f"Get latest conversation for user {user_id}"
+        )
+        if not rows:
+            return {"conversation": None, "messages": []}
+        conversation = rows[0]
+        messages = conversation.pop("messages", None) or []
+        return {"conversation": conversation, "messages": messages[::-1]}
+
+    def add_message(self, conversation_id: IdLike, message: MessagesInsert) -> Dict:
         """Add message to conversation"""
-        msg_data = message.model_dump()
-        msg_data.pop("message_id", None)  # Let DB generate UUID
-        msg_data.pop("created_at", None)  # Let DB generate created_at
-        msg_data["conversation_id"] = str(conversation_id)
+        msg_data = message.model_dump(exclude=MESSAGE_DB_GENERATED)
+        msg_data["conversation_id"] = _id_str(conversation_id)
         data = self._execute_query(
             lambda: self.client.table("messages").insert(msg_data),
             f"Add message to conversation {conversation_id}"
         )
         return data[0] if data else {}
+
+    def add_messages(self, conversation_id: IdLike, messages: List[MessagesInsert]) -> List[Dict]:
+        """Add several messages to conversation in one insert (one round trip)"""
+        conversation_id = _id_str(conversation_id)
+        # One INSERT would give every row the same now(), and messages are read
+        # back ordered by created_at alone; explicit, strictly increasing
+        # timestamps keep the batch in the order it was sent
+        base = datetime.now(timezone.utc)
+        rows = []
+        for i, message in enumerate(messages):
+            msg_data = message.model_dump(exclude=MESSAGE_DB_GENERATED)
+            msg_data["conversation_id"] = conversation_id
+            msg_data["created_at"] = (base + timedelta(microseconds=i)).isoformat()
+            rows.append(msg_data)
+        if not rows:
+            return []
+        return self._execute_query(
+            lambda: self.client.table("messages").insert(rows),
+            f"Add {len(rows)} messages to conversation {conversation_id}"
+        ) or []
     
-    def get_messages(self, conversation_id: UUID, limit: int = 50) -> List[Dict]:
-        """Get messages from conversation"""
-        return self._get_multiple(
+    def get_messages(self, conversation_id: IdLike, limit: int = 50, recent: bool = False) -> List[Dict]:
+        """Get messages from conversation, oldest first.
+
+        With `recent=True` the *latest* `limit` messages are returned instead of the first ones.
+        """
+        messages = self._get_multiple(
             lambda: self.client.table("messages")
                 .select("*")
-                .eq("conversation_id", str(conversation_id))
-                .order("created_at", desc=False)
+                .eq("conversation_id", _id_str(conversation_id))
+                .order("created_at", desc=recent)
                 .limit(limit),
             f"Get messages from conversation {conversation_id}"
         )
+        return messages[::-1] if recent else messages
     
     # NOTE: This is for testing purposes only
     def create_conversation(self, conversation: ConversationsInsert) -> Dict:
         """Create a new conversation"""
-        conv_data = conversation.model_dump()
-        conv_data.pop("conversation_id", None)  # Let DB generate UUID
-        conv_data.pop("created_at", None)  # Let DB generate created_at
-        conv_data.pop("updated_at", None)  # Let DB generate updated_at
+        conv_data = conversation.model_dump(exclude=CONVERSATION_DB_GENERATED)
 
         data = self._execute_query(
             lambda: self.client.table("conversations").insert(conv_data),
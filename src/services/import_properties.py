@@ -8,7 +8,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from services.scrape_property import PropertyScraper
 from services.property_service import PropertyService
-from core.supabase_client import SupabaseClient
+from core.config.supabase_client import SupabaseClient
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -17,6 +17,7 @@ logger = logging.getLogger(__name__)
 def scrape_and_import(url: str, skip_duplicates: bool = True):
     """Scrape properties from URL and import to database"""
     logger.info(f"Starting scrape from: {url}")
+    property_service = PropertyService()
     
     #Scrape properties
     scraper = PropertyScraper()
@@ -31,29 +32,14 @@ def scrape_and_import(url: str, skip_duplicates: bool = True):
         logger.warning("No properties found to import")
         return
     
-    # Filter duplicates if needed
-    if skip_duplicates:
-        property_service = PropertyService()
-        filtered_properties = []
-        
-        for prop in properties:
-            listing_id = prop.get('listing_id')
-            if listing_id and property_service.check_duplicate_listing(listing_id):
-                logger.info(f"Skipping duplicate: {listing_id}")
-            else:
-                filtered_properties.append(prop)
-        
-        logger.info(f"Filtered to {len(filtered_properties)} new properties")
-        properties = filtered_properties
-    
-    if not properties:
-        logger.info("No new properties to import")
-        return
-       
-    #Import to database
-    property_service = PropertyService()
+    #Import to database (duplicates are filtered by the service in one lookup)
     try:
-        result = property_service.bulk_insert_properties(properties)
+        result = property_service.bulk_insert_properties(properties, skip_existing=skip_duplicates)
+        if skip_duplicates:
+            logger.info(f"Filtered to {result['total']} new properties")
+        if not result['total']:
+            logger.info("No new properties to import")
+            return
         logger.info(f"✅ Import complete!")
         logger.info(f"   Inserted: {result['inserted']}/{result['total']}")
         
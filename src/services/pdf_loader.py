@@ -1,16 +1,34 @@
 import re
 from PyPDF2 import PdfReader
 
+# Patterns compiled once at import rather than looked up per call
+_WS_RE = re.compile(r'\s+')
+_MAIN_SPLIT_RE = re.compile(r'(?=\b\d+\.\s)')
+_MAIN_MATCH_RE = re.compile(r'(\d+)\.\s*(.*)')
+_SUB_SPLIT_RE = re.compile(r'(?=\([a-z]\)\s)')
+_SUB_MATCH_RE = re.compile(r'\(([a-z])\)\s*(.*)')
+# Uppercase heading words, up to the first Capitalised word of the body
+_TITLE_RE = re.compile(r'([A-Z][A-Z\s\-&,]+?)(?=\s+[A-Z][a-z])')
+
+
+def _page_texts(reader):
+    """Non-empty text of each page, extracting every page only once."""
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            yield text
+
+
 def load_pdf_smart_clauses(file_path):
     """
     Parse tenancy PDFs into main/sub-clauses (4(a), 4(b), …) and extract clean clause titles.
     Returns list[dict]: [{'label': '4(a)', 'title': 'Payment Of Property Tax', 'text': '...'}, …]
     """
     reader = PdfReader(file_path)
-    text = " ".join([page.extract_text() for page in reader.pages if page.extract_text()])
-    text = re.sub(r'\s+', ' ', text)  # normalize whitespace
+    text = " ".join(_page_texts(reader))
+    text = _WS_RE.sub(' ', text)  # normalize whitespace
 
-    main_sections = re.split(r'(?=\b\d+\.\s)', text)
+    main_sections = _MAIN_SPLIT_RE.split(text)
     results = []
 
     for section in main_sections:
@@ -19,7 +37,7 @@ def load_pdf_smart_clauses(file_path):
             continue
 
         # ---- Extract main clause number (e.g. "4.") ----
-        main_match = re.match(r'(\d+)\.\s*(.*)', section)
+        main_match = _MAIN_MATCH_RE.match(section)
         if not main_match:
             continue
 
@@ -27,7 +45,7 @@ def load_pdf_smart_clauses(file_path):
         section_body = main_match.group(2)
 
         # ---- Split sub-clauses like (a), (b), (c) ----
-        sub_clauses = re.split(r'(?=\([a-z]\)\s)', section_body)
+        sub_clauses = _SUB_SPLIT_RE.split(section_body)
 
         if len(sub_clauses) > 1:
             for sub in sub_clauses:
@@ -35,7 +53,7 @@ def load_pdf_smart_clauses(file_path):
                 if not sub:
                     continue
 
-                sub_match = re.match(r'\(([a-z])\)\s*(.*)', sub)
+                sub_match = _SUB_MATCH_RE.match(sub)
                 if not sub_match:
                     continue
                 sub_letter, sub_text = sub_match.groups()
@@ -43,7 +61,7 @@ def load_pdf_smart_clauses(file_path):
 
                 # ---- Improved title extraction ----
                 # Match uppercase words followed by punctuation or lowercase (end of heading)
-                title_match = re.match(r'([A-Z][A-Z\s\-&,]+?)(?=\s+[A-Z][a-z])', sub_text)
+                title_match = _TITLE_RE.match(sub_text)
                 if title_match:
                     title = title_match.group(1).strip().title()
                     body = sub_text[len(title_match.group(0)):].strip()
@@ -57,7 +75,7 @@ def load_pdf_smart_clauses(file_path):
                 })
         else:
             # ---- Single-clause section ----
-            title_match = re.match(r'([A-Z][A-Z\s\-&,]+?)(?=\s+[A-Z][a-z])', section_body)
+            title_match = _TITLE_RE.match(section_body)
             if title_match:
                 title = title_match.group(1).strip().title()
                 body = section_body[len(title_match.group(0)):].strip()
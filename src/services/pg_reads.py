@@ -0,0 +1,91 @@
+"""
+Hot read queries straight against Postgres over the asyncpg pool.
+
+Same results and errors as the matching PostgREST service methods
+(UserService.get_user, ReminderService.list_reminders, ConversationService.get_messages),
+the latter streamed row by row.
+"""
+
+from services.exceptions import OperationError, NotFoundError
+from services.user import USER_PUBLIC_COLUMNS
+from uuid import UUID
+from typing import AsyncIterator, List, Dict
+
+
+async def _fetch(pool, error_context: str, sql: str, *args) -> List[Dict]:
+    try:
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(sql, *args)
+    except Exception as e:
+        raise OperationError(f"{error_context} failed: {str(e)}")
+    return [dict(r) for r in rows]
+
+
+async def get_user(pool, user_id: UUID) -> Dict:
+    """Get user by ID. Raises NotFoundError if not found."""
+    error_context = f"Get user {user_id}"
+    rows = await _fetch(pool, error_context, f"SELECT {USER_PUBLIC_COLUMNS} FROM users WHERE user_id = $1", user_id)
+    if not rows:
+        raise NotFoundError(f"{error_context} - Resource not found")
+    return rows[0]
+
+
+async def list_reminders(pool, user_id: UUID, include_sent: bool = False) -> List[Dict]:
+    """List all reminders for user"""
+    sql = "SELECT * FROM reminders WHERE user_id = $1"
+    if not include_sent:
+        sql += " AND status IS DISTINCT FROM 'sent'"
+    return await _fetch(pool, f"List reminders for user {user_id}", sql, user_id)
+
+
+# Rows fetched from the messages cursor per round trip
+MESSAGES_FETCH_SIZE = 100
+
+
+async def iter_messages(pool, conversation_id: UUID, limit: int = 50, recent: bool = False) -> AsyncIterator[Dict]:
+    """
+    Open a server-side cursor over the conversation's messages (oldest first)
+    and return an async iterator over them, without materializing the list.
+
+    Acquiring a connection, running the query and fetching the first batch all
+    happen here, before anything is streamed, so failures raise OperationError
+    while the caller can still answer with an error status.
+    """
+    error_context = f"Get messages from conversation {conversation_id}"
+    sql = "SELECT * FROM messages WHERE conversation_id = $1 ORDER BY created_at ASC LIMIT $2"
+    if recent:
+        # Latest `limit` messages, still delivered oldest first
+        sql = (
+            "SELECT * FROM (SELECT * FROM messages WHERE conversation_id = $1 "
+            "ORDER BY created_at DESC LIMIT $2) latest ORDER BY created_at ASC"
+        )
+
+    conn = None
+    try:
+        conn = await pool.acquire()
+        transaction = conn.transaction()  # cursors need a transaction
+        await transaction.start()
+        cursor = await conn.cursor(sql, conversation_id, limit)
+        first_batch = await cursor.fetch(MESSAGES_FETCH_SIZE)
+    except Exception as e:
+        if conn is not None:
+            await pool.release(conn)  # release resets it, rolling back the transaction
+        raise OperationError(f"{error_context} failed: {str(e)}")
+
+    return _stream_cursor(pool, conn, transaction, cursor, first_batch)
+
+
+async def _stream_cursor(pool, conn, transaction, cursor, batch) -> AsyncIterator[Dict]:
+    """Yield the rows of an open cursor, then end its transaction and release the connection."""
+    try:
+        while batch:
+            for row in batch:
+                yield dict(row)
+            if len(batch) < MESSAGES_FETCH_SIZE:
+                break
+            batch = await cursor.fetch(MESSAGES_FETCH_SIZE)
+    finally:
+        try:
+            await transaction.rollback()  # read-only; nothing to commit
+        finally:
+            await pool.release(conn)
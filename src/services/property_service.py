@@ -1,24 +1,55 @@
 from services.base import BaseService
-from services.schema import PropertyPreferencesInsert, PropertyPreferencesUpdate
+from services.schema import PropertyPreferencesInsert, PropertyPreferencesUpdate, PropertiesInsert
 from uuid import UUID
 from typing import Optional, Dict, List
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Listing columns; leaves out image_embeddings / location_earth (large, never displayed)
+PROPERTY_LISTING_COLUMNS = (
+    "property_id, listing_id, address, neighborhood, property_type, listing_status, "
+    "rent, rent_psf, deposit, num_bedrooms, num_bathrooms, sqft, floor_level, property_age, "
+    "furnished, is_pet_friendly, is_basement, is_top_floor, amenities, "
+    "lease_term_options_in_months, mrt_info, latitude, longitude, "
+    "available_from, created_at, updated_at"
+)
+
+
+
+def normalize_listing_id(listing_id) -> Optional[str]:
+    """
+    Canonical text form of a listing id, so ids compare equal whatever their
+    source: the scraper yields strings ("123"), while properties.listing_id is
+    numeric and comes back from PostgREST as a JSON number (123 or 123.0).
+    """
+    if listing_id is None:
+        return None
+    text = str(listing_id).strip()
+    if not text:
+        return None
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return text
+    return str(int(value)) if value == value.to_integral_value() else str(value)
+
+
 class PropertyService(BaseService):
     """Property and preference operations"""
 
     def get_preferences(self, user_id: UUID) -> Dict:
-        """Get user's property preferences"""
-        try:
-            response = self.client.table("property_preferences").select("*").eq("user_id", str(user_id)).execute()
-            if not response.data:
-                raise NotFoundError(f"Preferences not found for user {user_id}")
-            return response.data[0]
-        except Exception as e:
-            from core.exceptions import OperationError, NotFoundError
-        raise OperationError(f"Get preferences failed: {str(e)}")
+        """Get user's property preferences. Raises NotFoundError if the user has none."""
+        return self._get_single(
+            lambda: self.client.table("property_preferences")
+                .select("*")
+                .eq("user_id", str(user_id)),
+            f"Get preferences for user {user_id}"
+        )
 
 
     def create_preferences(self, preferences: PropertyPreferencesInsert) -> Dict:
@@ -46,65 +77,145 @@ class PropertyService(BaseService):
     def get_properties(self, limit: int = 20, offset: int = 0) -> List[Dict]:
         """Get properties with pagination"""
         try:
-            response = self.client.table("properties").select("*").range(offset, offset + limit - 1).execute()
+            response = self.client.table("properties").select(PROPERTY_LISTING_COLUMNS).range(offset, offset + limit - 1).execute()
             return response.data or []
         except Exception as e:
             from core.exceptions import OperationError
             raise OperationError(f"Get properties failed: {str(e)}")
 
+    # Range preferences -> (properties column, PostgREST operator)
+    _PREFERENCE_RANGE_FILTERS = {
+        "min_budget": ("rent", "gte"),
+        "max_budget": ("rent", "lte"),
+        "min_bedrooms": ("num_bedrooms", "gte"),
+        "max_bedrooms": ("num_bedrooms", "lte"),
+        "min_bathrooms": ("num_bathrooms", "gte"),
+        "min_sqft": ("sqft", "gte"),
+        "max_sqft": ("sqft", "lte"),
+    }
+    # List preferences -> properties column that must be one of the values
+    _PREFERENCE_IN_FILTERS = {
+        "preferred_neighborhoods": "neighborhood",
+        "property_type": "property_type",
+    }
+    SEARCH_LIMIT = 100
+
     # TODO: Enhance search to consider location proximity using max_distance_from_mrt_in_km
     # and to allow searching by image embeddings
     def search_by_preferences(self, user_id: UUID) -> List[Dict]:
-        """Search properties matching user preferences"""
+        """Search properties matching user preferences (filtered by the database, not in Python)"""
+        prefs = self._get_multiple(
+            lambda: self.client.table("property_preferences")
+                .select(", ".join([*self._PREFERENCE_RANGE_FILTERS, *self._PREFERENCE_IN_FILTERS]))
+                .eq("user_id", str(user_id))
+                .limit(1),
+            f"Get preferences for user {user_id}"
+        )
+        prefs = prefs[0] if prefs else {}
+
+        def build_query():
+            query = self.client.table("properties").select(PROPERTY_LISTING_COLUMNS)
+            for pref, (column, op) in self._PREFERENCE_RANGE_FILTERS.items():
+                if prefs.get(pref) is not None:
+                    query = getattr(query, op)(column, prefs[pref])
+            for pref, column in self._PREFERENCE_IN_FILTERS.items():
+                if prefs.get(pref):
+                    query = query.in_(column, prefs[pref])
+            return query.limit(self.SEARCH_LIMIT)
+
+        return self._get_multiple(build_query, f"Search properties for user {user_id}")
+        
+    # Rows per insert request in bulk imports (small, so a failed chunk loses little)
+    INSERT_CHUNK = 200
+    # Insert requests in flight at once; inserts are network-bound
+    INSERT_WORKERS = 8
+
+    @staticmethod
+    def _scraped_to_row(prop: Dict) -> Dict:
+        """Map a scraped listing onto properties columns, dropping missing (None) values"""
+        prop_data = {
+            'address': prop.get('address'),
+            'rent': prop.get('price'),
+            'rent_psf': prop.get('price_psf'),
+            'num_bedrooms': prop.get('bedrooms'),
+            'num_bathrooms': prop.get('bathrooms'),
+            'sqft': prop.get('area_sqft'),
+            'property_type': prop.get('unit_type'),
+            'listing_status': prop.get('availability'),
+            'mrt_info': prop.get('mrt_info'),
+            'listing_id': prop.get('listing_id'),
+            # Add any other fields that match your database schema
+        }
+        return {k: v for k, v in prop_data.items() if v is not None}
+
+    def _insert_chunk(self, chunk: List[Dict]):
+        """Insert one chunk of rows; returns (inserted_count, errors)"""
         try:
-            # Just get all properties without filters
-            query = self.client.table("properties").select("*")
-            response = query.execute()
-            return response.data or []
+            self.client.table("properties").insert(chunk).execute()
+            return len(chunk), []
         except Exception as e:
-            from core.exceptions import OperationError
-            raise OperationError(f"Search properties failed: {str(e)}")
-        
-    def bulk_insert_properties(self, properties: List[Dict]) -> Dict:
+            ids = [row.get('listing_id', 'unknown') for row in chunk]
+            error_msg = f"Failed to insert {len(chunk)} properties ({ids[0]} .. {ids[-1]}): {str(e)}"
+            logger.warning(error_msg)
+            return 0, [error_msg]
+
+    def _drop_existing_listings(self, properties: List[Dict]) -> List[Dict]:
+        """
+        Listings not yet in the database, first occurrence only. One existence
+        lookup for the whole batch, then an O(1) set check per listing.
+        """
+        seen = self.get_existing_listing_ids([prop.get('listing_id') for prop in properties])
+        new_properties = []
+        for prop in properties:
+            # Same normalised form as the ids in `seen`
+            listing_id = normalize_listing_id(prop.get('listing_id'))
+            if listing_id and listing_id in seen:
+                logger.info(f"Skipping duplicate: {listing_id}")
+                continue
+            if listing_id:
+                seen.add(listing_id)  # repeated within this batch
+            new_properties.append(prop)
+        return new_properties
 
-        """Bulk insert scraped properties into database"""
+    def bulk_insert_properties(self, properties: List[Dict], skip_existing: bool = False) -> Dict:
+        """
+        Bulk insert scraped properties into database, INSERT_CHUNK rows per request.
+        With skip_existing, listings already stored (or repeated in the batch) are left out.
+        """
         inserted = 0
         errors = []
-        
+        skipped = 0
+        if skip_existing:
+            new_properties = self._drop_existing_listings(properties)
+            skipped = len(properties) - len(new_properties)
+            properties = new_properties
+
+        # A PostgREST bulk insert needs the same keys in every row (a missing
+        # key would become NULL rather than the column default), so rows are
+        # grouped by their key set and each group is sent in chunks
+        groups = defaultdict(list)
         for prop in properties:
-            try:
-                # Remove fields that shouldn't be in database or are auto-generated
-                prop_data = {
-                    'address': prop.get('address'),
-                    'rent': prop.get('price'),
-                    'rent_psf': prop.get('price_psf'),
-                    'num_bedrooms': prop.get('bedrooms'),
-                    'num_bathrooms': prop.get('bathrooms'),
-                    'sqft': prop.get('area_sqft'),
-                    'property_type': prop.get('unit_type'),
-                    'listing_status': prop.get('availability'),
-                    'mrt_info': prop.get('mrt_info'),
-                    'listing_id': prop.get('listing_id'),
-                    # Add any other fields that match your database schema
-                }
-                
-                # Remove None values
-                prop_data = {k: v for k, v in prop_data.items() if v is not None}
-                
-                # Insert into database
-                self.client.table("properties").insert(prop_data).execute()
-                inserted += 1
-                
-            except Exception as e:
-                from core.exceptions import OperationError
-                error_msg = f"Failed to insert property {prop.get('listing_id', 'unknown')}: {str(e)}"
-                errors.append(error_msg)
-                logger.warning(error_msg)
-                continue
-        
+            row = self._scraped_to_row(prop)
+            groups[frozenset(row)].append(row)
+
+        chunks = []
+        for rows in groups.values():
+            rows_iter = iter(rows)
+            while chunk := list(islice(rows_iter, self.INSERT_CHUNK)):
+                chunks.append(chunk)
+
+        # Chunks are independent; send them concurrently and merge the results
+        with ThreadPoolExecutor(max_workers=self.INSERT_WORKERS) as executor:
+            futures = [executor.submit(self._insert_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                chunk_inserted, chunk_errors = future.result()
+                inserted += chunk_inserted
+                errors.extend(chunk_errors)
+
         return {
             'success': True,
             'inserted': inserted,
+            'skipped': skipped,
             'total': len(properties),
             'errors': errors
         }
@@ -117,12 +228,33 @@ class PropertyService(BaseService):
         except Exception as e:
             logger.error(f"Duplicate check failed: {str(e)}")
             return False
+
+    # listing_ids per IN (...) query; keeps the PostgREST request URL short
+    LISTING_ID_CHUNK = 200
+
+    def get_existing_listing_ids(self, listing_ids: List[str]) -> set:
+        """
+        Which of the given listing_ids already exist in database (one query per chunk).
+        Returned as normalize_listing_id() strings, whatever type the DB column has.
+        """
+        ids = list(dict.fromkeys(filter(None, map(normalize_listing_id, listing_ids))))
+        existing = set()
+        try:
+            for start in range(0, len(ids), self.LISTING_ID_CHUNK):
+                chunk = ids[start:start + self.LISTING_ID_CHUNK]
+                response = self.client.table("properties").select("listing_id").in_("listing_id", chunk).execute()
+                existing.update(normalize_listing_id(row["listing_id"]) for row in response.data)
+        except Exception as e:
+            logger.error(f"Duplicate check failed: {str(e)}")
+        return existing
     
     # NOTE: This is just for testing purposes, unless we have an interface
     # for property agents to add properties.
-    def create_property(self, property_data: dict) -> Dict:
+    def create_property(self, property: PropertiesInsert) -> Dict:
         """Create a new property"""
-        property_data.pop("property_id", None)
+        # Only fields the caller sent; DB defaults fill in the rest
+        property_data = property.model_dump(exclude_unset=True)
+        property_data.pop("property_id", None)  # Let DB generate UUID
 
         data = self._execute_query(
             lambda: self.client.table("properties").insert(property_data),
@@ -9,7 +9,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from lxml import etree, html
 from typing import List, Dict, Optional
 import time
 import logging
@@ -17,6 +17,76 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Numbers in listing fields, e.g. "S$ 4,200 /mo", "2,000 sqft"
+_PRICE_RE = re.compile(r'[\d,]+\.?\d*')
+_NUM_RE = re.compile(r'\d+')
+
+
+_CARD_XP = etree.XPath('//div[@da-listing-id]')
+
+# Card elements read in one walk over each card, keyed by (tag, da-id) or
+# (tag, css class). The first match in document order wins, like select_one.
+_DA_ID_FIELDS = {
+    ('div', 'listing-card-v2-bedrooms'): 'bedrooms',
+    ('div', 'listing-card-v2-bathrooms'): 'bathrooms',
+    ('div', 'listing-card-v2-area'): 'area_sqft',
+    ('div', 'listing-card-v2-unit-type'): 'unit_type',
+    ('div', 'listing-card-v2-availability'): 'availability',
+    ('div', 'listing-card-v2-mrt'): 'mrt_info',
+    ('span', 'listing-card-v2-agent-name'): 'agent_name',
+    ('span', 'listing-card-v2-agency-name'): 'agency_name',
+}
+_CLASS_FIELDS = {
+    ('h3', 'listing-type-text'): 'title',
+    ('p', 'listing-address'): 'address',
+    ('div', 'listing-price'): 'price',
+    ('p', 'listing-ppa'): 'price_psf',
+    ('a', 'card-footer'): 'url',
+}
+# da-id containers whose value sits in a descendant: field -> (tag, class or None)
+_CONTAINER_VALUES = {
+    'bedrooms': ('p', None),
+    'bathrooms': ('p', None),
+    'area_sqft': ('p', None),
+    'unit_type': ('p', None),
+    'availability': ('p', None),
+    'mrt_info': ('span', 'listing-location-value'),
+}
+
+
+def _collect_fields(listing) -> Dict:
+    """Field name -> element, from a single walk over the card's subtree"""
+    fields = {}
+    for el in listing.iter(etree.Element):
+        tag = el.tag
+        da_id = el.get('da-id')
+        if da_id:
+            key = _DA_ID_FIELDS.get((tag, da_id))
+            if key and key not in fields:
+                fields[key] = el
+        classes = el.get('class')
+        if classes:
+            for cls in classes.split():
+                key = _CLASS_FIELDS.get((tag, cls))
+                if key and key not in fields:
+                    fields[key] = el
+
+    for key, (tag, cls) in _CONTAINER_VALUES.items():
+        container = fields.get(key)
+        if container is not None:
+            fields[key] = next(
+                (el for el in container.iterdescendants(tag)
+                 if cls is None or cls in (el.get('class') or '').split()),
+                None,
+            )
+    return fields
+
+
+def _text(elem) -> str:
+    """Stripped text of an element (including descendants), or ''"""
+    return elem.text_content().strip() if elem is not None else ''
+
+
 class PropertyScraper:
     """Scrapes property listings from PropertyGuru Singapore"""
     
@@ -59,9 +129,9 @@ class PropertyScraper:
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             time.sleep(2)
             
-            # Get page source and parse
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            properties = self._parse_listings(soup)
+            # Get page source and parse (lxml: C parser and XPath engine)
+            root = html.fromstring(self.driver.page_source)
+            properties = self._parse_listings(root)
             
             logger.info(f"Successfully scraped {len(properties)} properties")
             return properties
@@ -74,30 +144,33 @@ class PropertyScraper:
                 self.driver.quit()
                 self.driver = None
             
-    def _parse_listings(self, soup: BeautifulSoup) -> List[Dict]:
+    def _parse_listings(self, root: html.HtmlElement) -> List[Dict]:
         """Parse PropertyGuru listings"""
         properties = []
         
         # Find all property cards
-        listings = soup.select('div[da-listing-id]')
+        listings = _CARD_XP(root)
         
         for listing in listings:
             try:
+                fields = _collect_fields(listing)
+                bedrooms, bathrooms, area = fields.get('bedrooms'), fields.get('bathrooms'), fields.get('area_sqft')
                 property_data = {
-                    'listing_id': self._get_listing_id(listing),
-                    'title': self._get_title(listing),
-                    'address': self._get_address(listing),
-                    'price': self._get_price(listing),
-                    'price_psf': self._get_price_psf(listing),
-                    'bedrooms': self._get_bedrooms(listing),
-                    'bathrooms': self._get_bathrooms(listing),
-                    'area_sqft': self._get_area(listing),
-                    'unit_type': self._get_unit_type(listing),
-                    'availability': self._get_availability(listing),
-                    'mrt_info': self._get_mrt_info(listing),
-                    'agent_name': self._get_agent_name(listing),
-                    'agency_name': self._get_agency_name(listing),
-                    'url': self._get_url(listing),
+                    'listing_id': listing.get('da-listing-id', ''),
+                    'title': _text(fields.get('title')),
+                    'address': _text(fields.get('address')),
+                    'price': self._parse_price(_text(fields.get('price'))),
+                    'price_psf': self._parse_price(_text(fields.get('price_psf'))),
+                    'bedrooms': self._parse_number(_text(bedrooms)) if bedrooms is not None else None,
+                    'bathrooms': self._parse_number(_text(bathrooms)) if bathrooms is not None else None,
+                    # Extract number from "2,000 sqft"
+                    'area_sqft': self._parse_number(_text(area)) if area is not None else None,
+                    'unit_type': _text(fields.get('unit_type')),
+                    'availability': _text(fields.get('availability')),
+                    'mrt_info': _text(fields.get('mrt_info')),
+                    'agent_name': _text(fields.get('agent_name')),
+                    'agency_name': _text(fields.get('agency_name')),
+                    'url': self._absolute_url(fields.get('url')),
                 }
                 
                 properties.append(property_data)
@@ -108,79 +181,9 @@ class PropertyScraper:
         
         return properties
     
-    def _get_listing_id(self, listing) -> str:
-        """Get listing ID"""
-        return listing.get('da-listing-id', '')
-    
-    def _get_title(self, listing) -> str:
-        """Get property title/estate name"""
-        title_elem = listing.select_one('h3.listing-type-text')
-        return title_elem.text.strip() if title_elem else ''
-    
-    def _get_address(self, listing) -> str:
-        """Get property address"""
-        address_elem = listing.select_one('p.listing-address')
-        return address_elem.text.strip() if address_elem else ''
-    
-    def _get_price(self, listing) -> float:
-        """Get property price"""
-        price_div = listing.select_one('div.listing-price')
-        price_text = price_div.text.strip() if price_div else ''
-        return self._parse_price(price_text)
-    
-    def _get_price_psf(self, listing) -> float:
-        """Get price per square foot"""
-        price_psf_elem = listing.select_one('p.listing-ppa')
-        price_psf_text = price_psf_elem.text.strip() if price_psf_elem else ''
-        return self._parse_price(price_psf_text)
-    
-    def _get_bedrooms(self, listing) -> Optional[int]:
-        """Get number of bedrooms"""
-        bedrooms_elem = listing.select_one('div[da-id="listing-card-v2-bedrooms"] p')
-        return self._parse_number(bedrooms_elem.text) if bedrooms_elem else None
-    
-    def _get_bathrooms(self, listing) -> Optional[int]:
-        """Get number of bathrooms"""
-        bathrooms_elem = listing.select_one('div[da-id="listing-card-v2-bathrooms"] p')
-        return self._parse_number(bathrooms_elem.text) if bathrooms_elem else None
-    
-    def _get_area(self, listing) -> Optional[int]:
-        """Get property area in sqft"""
-        area_elem = listing.select_one('div[da-id="listing-card-v2-area"] p')
-        if area_elem:
-            # Extract number from "2,000 sqft"
-            return self._parse_number(area_elem.text)
-        return None
-    
-    def _get_unit_type(self, listing) -> str:
-        """Get unit type (e.g., Corner Terrace)"""
-        unit_type_elem = listing.select_one('div[da-id="listing-card-v2-unit-type"] p')
-        return unit_type_elem.text.strip() if unit_type_elem else ''
-    
-    def _get_availability(self, listing) -> str:
-        """Get availability status"""
-        avail_elem = listing.select_one('div[da-id="listing-card-v2-availability"] p')
-        return avail_elem.text.strip() if avail_elem else ''
-    
-    def _get_mrt_info(self, listing) -> str:
-        """Get MRT proximity information"""
-        mrt_elem = listing.select_one('div[da-id="listing-card-v2-mrt"] span.listing-location-value')
-        return mrt_elem.text.strip() if mrt_elem else ''
-    
-    def _get_agent_name(self, listing) -> str:
-        """Get agent name"""
-        agent_elem = listing.select_one('span[da-id="listing-card-v2-agent-name"]')
-        return agent_elem.text.strip() if agent_elem else ''
-    
-    def _get_agency_name(self, listing) -> str:
-        """Get agency name"""
-        agency_elem = listing.select_one('span[da-id="listing-card-v2-agency-name"]')
-        return agency_elem.text.strip() if agency_elem else ''
-    
-    def _get_url(self, listing) -> str:
-        """Get property listing URL"""
-        link = listing.select_one('a.card-footer')
-        url = link.get('href', '') if link else ''
+    def _absolute_url(self, link) -> str:
+        """Get property listing URL from the card's footer link"""
+        url = link.get('href', '') if link is not None else ''
         if url and not url.startswith('http'):
             url = f"https://www.propertyguru.com.sg{url}"
         return url
@@ -188,17 +191,16 @@ class PropertyScraper:
     def _parse_price(self, price_str: str) -> float:
         """Extract numeric price from string"""
         try:
-            numbers = re.findall(r'[\d,]+\.?\d*', price_str)
-            if numbers:
-                return float(numbers[0].replace(',', ''))
-            return 0.0
-        except:
+            match = _PRICE_RE.search(price_str)
+            return float(match.group().replace(',', '')) if match else 0.0
+        except (ValueError, AttributeError, TypeError):
+            # e.g. a bare "," matched, or no text at all
             return 0.0
     
     def _parse_number(self, text: str) -> Optional[int]:
         """Extract integer from text"""
         try:
-            numbers = re.findall(r'\d+', text.replace(',', ''))
-            return int(numbers[0]) if numbers else None
-        except:
+            match = _NUM_RE.search(text.replace(',', ''))
+            return int(match.group()) if match else None
+        except (ValueError, AttributeError, TypeError):
             return None
\ No newline at end of file
@@ -28,4 +28,27 @@ class TenantProfileService(BaseService):
         )
         return data[0] if data else {}
 
+    def get_tenant_bundle(self, user_id: UUID) -> Dict:
+        """
+        Get tenant profile and property preferences in a single query.
+        Both tables are embedded from `users` via their user_id foreign keys.
+        """
+        data = self._execute_query(
+            lambda: self.client.table("users")
+                .select("tenant_profiles(*), property_preferences(*)")
+                .eq("user_id", str(user_id)),
+            f"Get tenant bundle for user {user_id}"
+        )
+        row = data[0] if data else {}
+
+        # PostgREST embeds one-to-one relations as an object, one-to-many as a list
+        profile = row.get("tenant_profiles")
+        if isinstance(profile, list):
+            profile = profile[0] if profile else None
+        preferences = row.get("property_preferences") or []
+        if isinstance(preferences, dict):
+            preferences = [preferences]
+
+        return {"profile": profile, "preferences": preferences}
+
     # TODO: Implement update methods for tenant profile
\ No newline at end of file
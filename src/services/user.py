@@ -5,6 +5,10 @@ from services.exceptions import NotFoundError, ValidationError
 from uuid import UUID
 from typing import Dict, Optional
 
+# Columns safe to return to clients (no password hash / reset token)
+USER_PUBLIC_COLUMNS = "user_id, email_id, name, user_type, created_at, updated_at, last_login"
+
+
 class UserService(BaseService):
     """User management"""
     
@@ -12,17 +16,17 @@ class UserService(BaseService):
         """Get user by ID. Raises NotFoundError if not found."""
         return self._get_single(
             lambda: self.client.table("users")
-                .select("*")
+                .select(USER_PUBLIC_COLUMNS)
                 .eq("user_id", str(user_id)),
             error_context=f"Get user {user_id}"
         )
     
-    def get_user_by_email(self, email: str) -> Optional[Dict]:
-        """Get user by email. Returns None if not found."""
+    def get_user_by_email(self, email: str, columns: str = "*") -> Optional[Dict]:
+        """Get user by email (only `columns`). Returns None if not found."""
         try:
             return self._get_single(
                 lambda: self.client.table("users")
-                    .select("*")
+                    .select(columns)
                     .eq("email_id", email),
                 error_context=f"Get user by email {email}"
             )
@@ -32,7 +36,7 @@ class UserService(BaseService):
     def create_user(self, user: UsersInsert) -> Dict:
         """Create new user. Raises ValidationError if email exists."""
         
-        if self.get_user_by_email(user.email_id):
+        if self.get_user_by_email(user.email_id, columns="user_id"):
             raise ValidationError(f"User with email {user.email_id} already exists")
 
         user_data = user.model_dump()
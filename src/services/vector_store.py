@@ -6,7 +6,7 @@ from dotenv import load_dotenv
 
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-supabase = SupabaseClient()
+supabase = SupabaseClient.get()
 
 def insert_tenancy_agreement_chunks(file_path: str, tenancy_agreement_id: str):
     """Embed each clause/sub-clause and store label, title, and text in Supabase."""
@@ -308,13 +308,14 @@ class LeaseQnAInput(BaseModel):
     input: str
 
 
-def build_lease_qna_tool(index: VectorStoreIndex, openai_client, llm, debug_log):
+def build_lease_qna_tool(index: VectorStoreIndex, openai_client, llm, debug_log, callback_manager=None):
     """Return the Lease Q&A FunctionTool using the provided VectorStoreIndex."""
     # retrieve deeper and let our reranker filter down
     qe = index.as_query_engine(
         similarity_top_k=15,          # look a bit deeper
         response_mode="compact",
         llm=llm,
+        callback_manager=callback_manager,  # None -> llama_index global default
     )
 
     def lease_qna_fn(input: str) -> str:
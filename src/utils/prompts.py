@@ -1,18 +1,28 @@
+import re
 from datetime import datetime
 import pytz  # if you want SG time
 
-sg_now = datetime.now()  # or datetime.now(pytz.timezone("Asia/Singapore"))
-current_iso = sg_now.isoformat(timespec="seconds")
-current_human = sg_now.strftime("%A, %d %B %Y, %I:%M %p")
+
+# The prompt and tools are built once per process, so "now" can't be baked
+# into them; each user message carries it instead (see current_datetime_note)
+def current_datetime_note(now: datetime | None = None) -> str:
+    """First line of every user message sent to the agent: the time of this turn."""
+    now = now or datetime.now()  # or datetime.now(pytz.timezone("Asia/Singapore"))
+    human = now.strftime("%A, %d %B %Y, %I:%M %p")
+    return f"[Current datetime: {human} ({now.isoformat(timespec='seconds')})]"
+
+
+# Matches the note (and its line break) in stored history
+DATETIME_NOTE_RE = re.compile(r"\[Current datetime: [^\]]*\]\n?")
 
 
 SYSTEM_ROUTING_PROMPT = """\
 You are Casa Amigo, a real-estate assistant with tools. 
 
-Today's date/time (user local): {current_human} ({current_iso}).
+Each user message starts with "[Current datetime: ...]", today's date/time (user local).
 When the user asks for or implies a date (e.g. "today", "tomorrow", "31st", "next month"),
-you MUST resolve it relative to this datetime.
-Use the current year {sg_now.year} by default.
+you MUST resolve it relative to that datetime.
+Use its year as the current year by default.
 
 Route by these rules:
 
@@ -0,0 +1,51 @@
+# utils/response_cache.py
+# ---------------------------------------------------------------------
+# Persistent response cache for repeated chat turns.
+# Keys hash everything that determines the answer (prompt, user, history,
+# message), so a hit only happens for a truly identical turn.
+# Stored on disk under ~/.cache/casa_amigo/ so it survives restarts.
+# ---------------------------------------------------------------------
+from __future__ import annotations
+import hashlib
+import os
+from typing import Optional
+
+from diskcache import Cache
+
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "casa_amigo")
+_TTL_SECONDS = 24 * 60 * 60  # lease/tool answers can change; don't replay forever
+
+_cache: Optional[Cache] = None
+
+
+def _get_cache() -> Cache:
+    global _cache
+    if _cache is None:
+        _cache = Cache(_CACHE_DIR)
+    return _cache
+
+
+def make_key(*parts) -> str:
+    """sha256 over the given parts (stringified, separator-joined)."""
+    raw = "\x1f".join(str(p) for p in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def history_fingerprint(messages) -> str:
+    """Stable text form of a chat history (role + content per message)."""
+    return "\n".join(f"{getattr(m, 'role', '')}:{getattr(m, 'content', '')}" for m in messages)
+
+
+def get(key: str) -> Optional[str]:
+    try:
+        return _get_cache().get(key)
+    except Exception as e:
+        print(f"[cache] get failed: {e}")
+        return None
+
+
+def set(key: str, value: str) -> None:
+    try:
+        _get_cache().set(key, value, expire=_TTL_SECONDS)
+    except Exception as e:
+        print(f"[cache] set failed: {e}")
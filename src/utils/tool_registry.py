@@ -4,12 +4,24 @@ from utils.reminder_tool import notification_workflow_tool, ReminderInput
 from utils.neighbourhood_research_tool import neighborhood_researcher, NeighborhoodInput
 from utils.lease_tool import build_lease_qna_tool, LeaseQnAInput
 from datetime import datetime
+import json
 import threading
 
 # ---- in-memory debug list if we want to show models debug logs --------------------------
 _DEBUG_LOG: list[dict] = []
 
+def format_args(args) -> str:
+    """Pretty-print tool args once, so the debug panel can render the string as-is."""
+    if isinstance(args, str):
+        return args
+    try:
+        return json.dumps(args, indent=2, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return str(args)
+
 def debug_log(event: str, **kwargs):
+    if "args" in kwargs:
+        kwargs["args_pretty"] = format_args(kwargs["args"])
     _DEBUG_LOG.append({"event": event, **kwargs})
 
 def consume_debug_log() -> list[dict]:
@@ -26,7 +38,7 @@ def personalised_recommendation(): ...
 
 # ---- Tool registry ---------------------------------------------------------
 
-def build_tools(index: VectorStoreIndex, similarity_top_k: int = 5, llm_client=None, llm=None):
+def build_tools(index: VectorStoreIndex, similarity_top_k: int = 5, llm_client=None, llm=None, callback_manager=None):
     """
     Build tools with shared LLM client for efficiency.
     
@@ -34,9 +46,10 @@ def build_tools(index: VectorStoreIndex, similarity_top_k: int = 5, llm_client=N
         index: Vector store index for RAG
         similarity_top_k: Number of similar documents to retrieve
         llm_client: OpenAI client instance to share across tools
+        callback_manager: Tracing callbacks for the tools' retrievers/query engines
     """
     
-    lease_qna_fn = build_lease_qna_tool(index, llm_client,llm, debug_log)
+    lease_qna_fn = build_lease_qna_tool(index, llm_client,llm, debug_log, callback_manager=callback_manager)
 
     # ----- tool 1: tenancy qna -------
     lease_qna = FunctionTool.from_defaults(
@@ -59,11 +72,8 @@ def build_tools(index: VectorStoreIndex, similarity_top_k: int = 5, llm_client=N
     )
 
     # ---------- tool 3: reminder / notification tool ----------------
-    from datetime import datetime
-    now = datetime.now()
-    iso = now.isoformat(timespec="seconds")
-    year = now.year
-    
+    # No datetime in the description: tools are built once per process, so it
+    # would go stale. The current time arrives with every user message.
     def reminder_tool_wrapper(input: ReminderInput | dict | None = None, **kwargs):
         """Wrapper that injects auth AND LLM client."""
         from utils.auth_store import get_auth_store
@@ -86,9 +96,9 @@ def build_tools(index: VectorStoreIndex, similarity_top_k: int = 5, llm_client=N
         name="notification_workflow_tool",
         description=(
             "Create and manage reminders related to tenancy milestones. "
-            f"Current datetime (authoritative): {iso}. "
-            f"Always resolve relative dates using this datetime. "
-            f"Default year: {year}. Never use 2023 unless user said 2023."
+            "The '[Current datetime: ...]' line of the user's message is authoritative. "
+            "Always resolve relative dates using that datetime. "
+            "Default year: its year. Never use 2023 unless user said 2023. "
             "Infer reminder_type_id based on the task: "
             "1=LOI, 2=Deposit, 3=Lease signing, 4=Rent (recurring), "
             "5=Renewal notice, 6=Move out. "
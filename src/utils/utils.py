@@ -9,6 +9,7 @@ import re
 from textwrap import shorten
 from typing import Optional
 import asyncio
+import threading
 import math, requests
 from functools import lru_cache
 import re
@@ -19,31 +20,30 @@ from bs4 import BeautifulSoup  # if you already use bs4 elsewhere; if not, you c
 # ------------------ Async workflow runner for sync contexts --------------
 
 
+# One long-lived event loop on a daemon thread, shared by every chat turn.
+# Avoids creating/tearing down a loop per turn and keeps async HTTP clients
+# (bound to the loop they were first used on) valid between turns.
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None or _LOOP.is_closed():
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="workflow-loop", daemon=True).start()
+        return _LOOP
+
 async def _run_workflow(workflow, message, memory,  **kwargs):
     return await workflow.run(user_msg=message, memory=memory,  **kwargs)
 
 def run_sync(workflow, message, memory, **kwargs):
-    try:
-        return asyncio.run(_run_workflow(workflow, message, memory))
-    except RuntimeError as e:
-        msg = str(e)
-        if "asyncio.run() cannot be called from a running event loop" in msg:
-            try:
-                import nest_asyncio
-                nest_asyncio.apply()
-            except Exception:
-                pass
-            loop = asyncio.get_event_loop()
-            return loop.run_until_complete(_run_workflow(workflow, message, memory,  **kwargs))
-        elif "no running event loop" in msg:
-            loop = asyncio.new_event_loop()
-            try:
-                asyncio.set_event_loop(loop)
-                return loop.run_until_complete(_run_workflow(workflow, message, memory,  **kwargs))
-            finally:
-                loop.close()
-        else:
-            raise
+    """Run the workflow on the background loop and block until it returns."""
+    future = asyncio.run_coroutine_threadsafe(
+        _run_workflow(workflow, message, memory, **kwargs),
+        _get_background_loop(),
+    )
+    return future.result()
 
 def extract_text(agent_output) -> str:
     """
@@ -0,0 +1,136 @@
+"""Response-cache keying and replay in CasaAmigoAgent.chat (no LLM calls)."""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+st = pytest.importorskip("streamlit")
+diskcache = pytest.importorskip("diskcache")
+pytest.importorskip("llama_index.llms.openai")
+pytest.importorskip("sentence_transformers")
+
+from llama_index.core.llms import ChatMessage  # noqa: E402
+
+from core import agent as agent_module  # noqa: E402
+from core.agent import AgentConfig, CasaAmigoAgent  # noqa: E402
+from core.memory import IncrementalChatMemory  # noqa: E402
+from utils import response_cache  # noqa: E402
+
+
+class _FakeWorkflow:
+    """Stands in for run_sync(workflow, ...): records the message, answers with the given tool calls."""
+
+    def __init__(self):
+        self.messages = []
+        self.tool_calls = []
+
+    def __call__(self, workflow, message, memory, **kwargs):
+        self.messages.append(message)
+        answer = f"answer {len(self.messages)}"
+        memory.put(ChatMessage(role="user", content=message))
+        memory.put(ChatMessage(role="assistant", content=answer))
+        return SimpleNamespace(response=answer, tool_calls=list(self.tool_calls))
+
+
+def _at(*args):
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(*args)
+    return _Clock
+
+
+@pytest.fixture
+def workflow(monkeypatch, tmp_path):
+    fake = _FakeWorkflow()
+    monkeypatch.setattr(agent_module, "run_sync", fake)
+    monkeypatch.setattr(agent_module, "datetime", _at(2026, 1, 5, 9, 0))
+    monkeypatch.setattr(response_cache, "_cache", diskcache.Cache(str(tmp_path)))
+    st.session_state.clear()
+    yield fake
+    response_cache._cache.close()
+    st.session_state.clear()
+
+
+def _agent(index_version="index-a"):
+    # Skip __init__ (LLM, tools, workflow): chat() only needs config, memory and the version
+    agent = CasaAmigoAgent.__new__(CasaAmigoAgent)
+    agent.config = AgentConfig(verbose=False)
+    agent.index_version = index_version
+    agent.workflow = None  # run_sync is replaced by _FakeWorkflow
+    return agent
+
+
+def _new_session():
+    st.session_state.clear()
+    st.session_state["chat_memory"] = IncrementalChatMemory.from_defaults(token_limit=2000, tokenizer_fn=str.split)
+
+
+def _lease_call():
+    return SimpleNamespace(tool_name="lease_qna", tool_kwargs={})
+
+
+def test_identical_turn_is_replayed_in_a_new_session(workflow):
+    workflow.tool_calls = [_lease_call()]
+    _new_session()
+    first = _agent().chat("What is the notice period?")
+    _new_session()
+    assert _agent().chat("What is the notice period?") == first
+    assert len(workflow.messages) == 1
+
+
+def test_follow_up_turns_replay_later_the_same_day(workflow, monkeypatch):
+    _new_session()
+    _agent().chat("hi")
+    _agent().chat("What is the deposit?")
+
+    # Later that day the datetime notes in the history differ, but are not part of the key
+    monkeypatch.setattr(agent_module, "datetime", _at(2026, 1, 5, 17, 30))
+    _new_session()
+    _agent().chat("hi")
+    _agent().chat("What is the deposit?")
+    assert len(workflow.messages) == 2
+
+
+def test_cache_misses_on_another_day_or_index(workflow, monkeypatch):
+    _new_session()
+    _agent().chat("hi")
+
+    _new_session()
+    _agent(index_version="index-b").chat("hi")  # rebuilt index
+    monkeypatch.setattr(agent_module, "datetime", _at(2026, 1, 6, 9, 0))
+    _new_session()
+    _agent().chat("hi")  # next day
+    assert len(workflow.messages) == 3
+
+
+def test_each_turn_carries_the_current_datetime(workflow):
+    _new_session()
+    _agent().chat("remind me tomorrow")
+    assert workflow.messages == ["[Current datetime: Monday, 05 January 2026, 09:00 AM (2026-01-05T09:00:00)]\nremind me tomorrow"]
+
+
+@pytest.mark.parametrize("tool_name", ["notification_workflow_tool", "some_new_tool"])
+def test_turns_with_tools_outside_the_allowlist_are_not_cached(workflow, tool_name):
+    workflow.tool_calls = [_lease_call(), SimpleNamespace(tool_name=tool_name, tool_kwargs={})]
+    for _ in range(2):
+        _new_session()
+        _agent().chat("set a rent reminder")
+    assert len(workflow.messages) == 2
+
+
+def test_turn_is_not_cached_when_tool_calls_are_unknown(workflow, monkeypatch):
+    def run_without_tool_calls(*args, **kwargs):
+        out = workflow(*args, **kwargs)
+        return SimpleNamespace(response=out.response)
+
+    monkeypatch.setattr(agent_module, "run_sync", run_without_tool_calls)
+    for _ in range(2):
+        _new_session()
+        _agent().chat("hi")
+    assert len(workflow.messages) == 2
@@ -0,0 +1,125 @@
+"""DocumentIndexManager helpers that run without building an index."""
+
+import os
+import random
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+pytest.importorskip("llama_index.core")
+pytest.importorskip("llama_index.embeddings.openai")
+
+from core.document_manager import DocumentIndexManager  # noqa: E402
+
+
+# ---- reference: the original line-by-line clause splitter ------------------
+
+_OLD_CLAUSE_RE = re.compile(
+    r"""(?imx)
+    ^\s*(?:Clause\s*)?
+    (?P<label>\d{1,4}\s*\(?[a-zA-Z]?\)?)
+    [\s:.\-–]*
+    (?P<title>[A-Za-z][^\n\r]{0,100})
+    """
+)
+
+_OLD_SUBCLAUSE_RE = re.compile(
+    r"""(?imx)
+    ^\s*\((?P<letter>[a-z])\)\s+
+    (?P<title>[A-Za-z][^\n\r]{0,100})?
+    """
+)
+
+
+def _old_split_into_clauses(text):
+    out, current = [], []
+    current_label, current_title, current_number = None, None, None
+
+    def flush():
+        nonlocal current, current_label, current_title
+        if current_label and current:
+            out.append((current_label, current_title or "", "\n".join(current).strip()))
+        current, current_label, current_title = [], None, None
+
+    for line in text.splitlines():
+        m_clause = _OLD_CLAUSE_RE.match(line)
+        m_sub = _OLD_SUBCLAUSE_RE.match(line) if not m_clause else None
+        if m_clause:
+            flush()
+            raw_label = re.sub(r"\s+", "", m_clause.group("label")).lower()
+            current_number = re.match(r"\d+", raw_label).group(0)
+            current_label = raw_label
+            current_title = (m_clause.group("title") or "").strip(" -–:")
+        elif m_sub and current_number:
+            flush()
+            current_label = f"{current_number}({m_sub.group('letter').lower()})"
+            current_title = (m_sub.group("title") or "").strip(" -–:")
+        else:
+            current.append(line)
+    flush()
+    return out
+
+
+_LINES = [
+    "5. Rent", "5(b) SECURITY DEPOSIT", "2 (b) Security Deposit", "Clause 5 (f) Option To Renew",
+    "  12. Repairs - tenant", "7: Notice", "2023(a) Year label", "(c) Repairs", "(D) upper letter",
+    "(e)", "(f)  ", "the tenant shall pay", "  indented body line", "", "   ", "1,200 dollars",
+    "(1) numbered item", "12345 too long label", "x" * 150, "5 " + "Long title " * 15,
+]
+_LINE_BREAKS = ["\n", "\r\n", "\r", "\x0c"]
+
+
+def _split(text):
+    return [(label, title, body) for label, _, title, body in DocumentIndexManager._split_into_clauses(None, text)]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_split_matches_line_based_splitter(seed):
+    rng = random.Random(seed)
+    text = ""
+    for _ in range(rng.randrange(0, 30)):
+        text += rng.choice(_LINES) + rng.choice(_LINE_BREAKS)
+    if rng.random() < 0.5:
+        text = text.rstrip("\r\n\x0c")
+    assert _split(text) == _old_split_into_clauses(text)
+
+
+def test_crlf_bodies_have_no_carriage_returns():
+    text = "5. Rent\r\nPay monthly.\r\nOn the 1st.\r\n(a) Late fees\r\n5% after a week.\r\n"
+    assert _split(text) == [
+        ("5", "Rent", "Pay monthly.\nOn the 1st."),
+        ("5(a)", "Late fees", "5% after a week."),
+    ]
+
+
+def _write_index(persist_dir, docstore="{}", vectors=b"\x00\x01"):
+    os.makedirs(persist_dir, exist_ok=True)
+    with open(os.path.join(persist_dir, "docstore.json"), "w") as f:
+        f.write(docstore)
+    with open(os.path.join(persist_dir, "default__vector_store.json"), "wb") as f:
+        f.write(vectors)
+
+
+def test_index_hash_is_stable_for_the_same_contents(tmp_path):
+    first, second = tmp_path / "a", tmp_path / "b"
+    _write_index(first)
+    _write_index(second)
+    # Same files in another directory (or another process) give the same version
+    assert DocumentIndexManager._persisted_index_hash(str(first)) == (
+        DocumentIndexManager._persisted_index_hash(str(second))
+    )
+
+
+def test_index_hash_changes_when_the_index_is_rebuilt(tmp_path):
+    persist_dir = str(tmp_path / "index")
+    _write_index(persist_dir)
+    before = DocumentIndexManager._persisted_index_hash(persist_dir)
+
+    _write_index(persist_dir, vectors=b"\x00\x02")  # e.g. a new embedding model
+    assert DocumentIndexManager._persisted_index_hash(persist_dir) != before
+
+    _write_index(persist_dir, docstore='{"clause": 1}')  # e.g. a new lease PDF
+    assert DocumentIndexManager._persisted_index_hash(persist_dir) != before
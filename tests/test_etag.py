@@ -0,0 +1,61 @@
+"""ETagMiddleware on top of fastapi-cache routes."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("fastapi_cache")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from fastapi_cache import FastAPICache  # noqa: E402
+from fastapi_cache.backends.inmemory import InMemoryBackend  # noqa: E402
+from fastapi_cache.decorator import cache  # noqa: E402
+
+from modules.etag import ETagMiddleware  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+
+    @app.get("/items")
+    @cache(expire=60)
+    async def items():
+        return {"items": [1, 2, 3]}
+
+    FastAPICache.init(InMemoryBackend(), prefix="test")
+    with TestClient(app) as client:
+        yield client
+    FastAPICache.reset()
+
+
+def test_cached_route_gets_a_content_hash_etag(client):
+    miss = client.get("/items")
+    hit = client.get("/items")
+    # Strong content hash, the same on a cache miss and hit (and in every worker),
+    # not fastapi-cache's W/<hash()> tag
+    assert miss.headers["etag"] == hit.headers["etag"]
+    assert not miss.headers["etag"].startswith("W/")
+
+
+def test_matching_if_none_match_gets_304(client):
+    etag = client.get("/items").headers["etag"]
+    revalidated = client.get("/items", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert client.get("/items", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_authenticated_responses_are_private(client):
+    response = client.get("/items", headers={"Authorization": "Bearer token"})
+    assert response.headers["cache-control"].startswith("private")
+    assert "max-age" in response.headers["cache-control"]
+
+    assert "private" not in client.get("/items").headers.get("cache-control", "")
@@ -0,0 +1,94 @@
+"""Access tokens: PyJWT round-trips and the verified-token cache."""
+
+import os
+import sys
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+jwt = pytest.importorskip("jwt")
+pytest.importorskip("fastapi")
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+
+from core.config import jwt_handler  # noqa: E402
+from core.config.jwt_handler import ALGORITHM, SECRET_KEY, create_access_token, verify_token  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_token_cache():
+    jwt_handler._token_cache.clear()
+    yield
+    jwt_handler._token_cache.clear()
+
+
+def test_token_decodes_with_pyjwt():
+    user_id = uuid4()
+    token = create_access_token(user_id, timedelta(minutes=5))
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["sub"] == str(user_id)
+    assert abs(payload["exp"] - (time.time() + 300)) < 5
+    assert jwt.get_unverified_header(token) == {"alg": "HS256", "typ": "JWT"}
+
+
+def test_token_matches_module_level_encode():
+    # Same bytes as PyJWT's own one-shot encoder for the same claims
+    token = create_access_token(uuid4())
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert token == jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def test_verify_token_round_trip():
+    user_id = uuid4()
+    assert verify_token(create_access_token(user_id)) == user_id
+
+
+def test_verify_token_rejects_tampered_and_foreign_tokens():
+    token = create_access_token(uuid4())
+    header, payload, signature = token.split(".")
+    tampered = ".".join([header, payload, ("A" if signature[0] != "A" else "B") + signature[1:]])
+    assert verify_token(tampered) is None
+
+    foreign = jwt.encode({"sub": str(uuid4())}, "another-secret-key-of-32-bytes-or-more", algorithm=ALGORITHM)
+    assert verify_token(foreign) is None
+    assert verify_token("not-a-jwt") is None
+
+
+def test_verify_token_rejects_expired_token():
+    assert verify_token(create_access_token(uuid4(), timedelta(seconds=-1))) is None
+
+
+def test_verified_token_is_cached_until_it_expires(monkeypatch):
+    user_id = uuid4()
+    token = create_access_token(user_id, timedelta(minutes=5))
+    assert verify_token(token) == user_id
+    assert len(jwt_handler._token_cache) == 1
+
+    # A cache hit does not verify again
+    monkeypatch.setattr(jwt_handler, "_decode_token", lambda token: pytest.fail("decoded again"))
+    assert verify_token(token) == user_id
+
+    # Past its exp the cached entry is dropped and the token rejected
+    now = time.time()
+    monkeypatch.setattr(jwt_handler.time, "time", lambda: now + 301)
+    assert verify_token(token) is None
+    assert len(jwt_handler._token_cache) == 0
+
+
+def test_token_close_to_expiry_is_not_cached():
+    token = create_access_token(uuid4(), timedelta(seconds=jwt_handler.TOKEN_CACHE_MIN_TTL_SECONDS - 1))
+    assert verify_token(token) is not None
+    assert len(jwt_handler._token_cache) == 0
+
+
+def test_token_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(jwt_handler, "TOKEN_CACHE_MAX_SIZE", 3)
+    tokens = [create_access_token(uuid4()) for _ in range(5)]
+    for token in tokens:
+        verify_token(token)
+    assert len(jwt_handler._token_cache) == 3
@@ -0,0 +1,66 @@
+"""IncrementalChatMemory.get must return exactly what ChatMemoryBuffer.get returns."""
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+pytest.importorskip("llama_index.core")
+
+from llama_index.core.llms import ChatMessage, MessageRole  # noqa: E402
+from llama_index.core.memory import ChatMemoryBuffer  # noqa: E402
+
+from core.memory import IncrementalChatMemory  # noqa: E402
+
+_ROLES = [MessageRole.USER, MessageRole.ASSISTANT, MessageRole.TOOL, MessageRole.SYSTEM]
+
+
+def _tokenize(text):
+    # Whitespace tokens: counts add up across the " " the base joins messages with
+    return text.split()
+
+
+def _random_message(rng):
+    words = " ".join(f"w{rng.randrange(100)}" for _ in range(rng.randrange(0, 40)))
+    return ChatMessage(role=rng.choice(_ROLES), content=words)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_get_matches_chat_memory_buffer(seed):
+    rng = random.Random(seed)
+    token_limit = rng.randrange(1, 120)
+    ours = IncrementalChatMemory.from_defaults(token_limit=token_limit, tokenizer_fn=_tokenize)
+    base = ChatMemoryBuffer.from_defaults(token_limit=token_limit, tokenizer_fn=_tokenize)
+
+    for _ in range(rng.randrange(0, 25)):
+        message = _random_message(rng)
+        ours.put(message)
+        base.put(message)
+        # get() after each put exercises the cached counts, not just a fresh history
+        initial = rng.randrange(0, token_limit + 1)
+        assert ours.get(initial_token_count=initial) == base.get(initial_token_count=initial)
+
+
+def test_oversized_last_message_is_still_returned():
+    memory = IncrementalChatMemory.from_defaults(token_limit=5, tokenizer_fn=_tokenize)
+    memory.put(ChatMessage(role=MessageRole.USER, content="hi"))
+    memory.put(ChatMessage(role=MessageRole.USER, content="a b c d e f g h"))
+    assert [m.content for m in memory.get()] == ["a b c d e f g h"]
+
+
+def test_leading_assistant_kept_when_nothing_is_trimmed():
+    memory = IncrementalChatMemory.from_defaults(token_limit=100, tokenizer_fn=_tokenize)
+    memory.put(ChatMessage(role=MessageRole.ASSISTANT, content="Hello! Ask me anything."))
+    memory.put(ChatMessage(role=MessageRole.USER, content="hi"))
+    assert len(memory.get()) == 2
+
+
+def test_set_replaces_cached_counts():
+    memory = IncrementalChatMemory.from_defaults(token_limit=3, tokenizer_fn=_tokenize)
+    memory.put(ChatMessage(role=MessageRole.USER, content="one two three four"))
+    memory.get()
+    memory.set([ChatMessage(role=MessageRole.USER, content="a"), ChatMessage(role=MessageRole.USER, content="b")])
+    assert [m.content for m in memory.get()] == ["a", "b"]
@@ -0,0 +1,77 @@
+"""Duplicate-listing detection in PropertyService (no database needed)."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+pytest.importorskip("pydantic")
+pytest.importorskip("supabase")
+
+from services.property_service import PropertyService, normalize_listing_id  # noqa: E402
+
+
+class _FakeQuery:
+    """Stands in for the PostgREST builder: table().select().in_().execute()"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requested = None
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.requested = list(values)
+        return self
+
+    def execute(self):
+        return type("Response", (), {"data": self.rows})()
+
+
+@pytest.fixture
+def service_with_rows(monkeypatch):
+    def make(rows):
+        fake = _FakeQuery(rows)
+        monkeypatch.setattr(PropertyService, "client", property(lambda self: fake))
+        return PropertyService(), fake
+    return make
+
+
+def test_normalize_listing_id():
+    assert normalize_listing_id("123") == "123"
+    assert normalize_listing_id(" 123 ") == "123"
+    assert normalize_listing_id(123) == "123"
+    assert normalize_listing_id(123.0) == "123"
+    assert normalize_listing_id("") is None
+    assert normalize_listing_id(None) is None
+
+
+def test_scraped_string_id_matches_numeric_row(service_with_rows):
+    # properties.listing_id is numeric, so PostgREST returns a JSON number
+    service, _ = service_with_rows([{"listing_id": 123}])
+    existing = service.get_existing_listing_ids(["123", "456"])
+    assert normalize_listing_id("123") in existing
+    assert normalize_listing_id("456") not in existing
+
+
+def test_bulk_insert_skips_listings_already_in_db(service_with_rows, monkeypatch):
+    service, _ = service_with_rows([{"listing_id": 123}])
+    inserted_chunks = []
+    monkeypatch.setattr(
+        PropertyService, "_insert_chunk",
+        lambda self, chunk: (inserted_chunks.append(chunk), (len(chunk), []))[1],
+    )
+
+    result = service.bulk_insert_properties(
+        [{"listing_id": "123"}, {"listing_id": "456"}, {"listing_id": "456"}],
+        skip_existing=True,
+    )
+
+    assert result["skipped"] == 2  # one already stored, one repeated in the batch
+    assert [row["listing_id"] for chunk in inserted_chunks for row in chunk] == ["456"]